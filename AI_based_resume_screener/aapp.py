@@ -0,0 +1,421 @@
+# aapp.py
+"""
+Async serving path for CVision.
+
+A parallel aiohttp app that shares fapp's matcher, prompts, pipeline stages
+and templates. Ollama and Gemini calls are awaited instead of holding a
+thread, the chunks of each scraped page are extracted concurrently, and only
+the blocking pieces (Selenium, pypdf, SQLite, BeautifulSoup) run in a small
+thread pool, so one process can serve many concurrent uploads.
+
+Usage (from AI_based_resume_screener/):
+    python aapp.py --port 8000 --workers 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode
+
+from aiohttp import web
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from werkzeug.utils import secure_filename
+
+from fapp import (
+    ResumeJobMatcher, allowed_file, app as flask_app,
+    JOB_EXTRACT_PROMPT, MATCHING_PROMPT, SCORING_PROMPT, SCORE_FIELDS
+)
+from resume_scraper import pipeline
+from resume_scraper.job_store import JobStore
+from resume_scraper.listing_registry import dedupe_jobs, job_fingerprint
+from resume_scraper.match_cache import ResumeKey
+from resume_scraper.llm_scheduler import Overloaded
+from resume_scraper.metrics import REGISTRY, span, timed, request_timer
+from resume_scraper.models import JobListing, ResumeProfile, canonical_json, dumps_json_list
+from resume_scraper.page_cache import RESULTS_PAGES, STATIC_PAGES, RenderedPage, results_path, save_results
+from resume_scraper.resume_processor import parse_resume_from_path_async
+from resume_scraper.scraper import crawl_pages, check_not_modified, build_search_url, clean_body_content, split_dom_content
+from resume_scraper.structured_output import IncrementalJSONParser, conform_to_schema, JOB_DETAILS_SCHEMA, MATCH_DETAILS_SCHEMA
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = flask_app.config['UPLOAD_FOLDER']
+
+# Endpoint names used by url_for() in the shared templates
+ROUTES = {
+    'index': '/',
+    'upload': '/upload',
+    'results': '/results',
+    'login_signup': '/login-signup',
+    'features': '/features',
+    'how_it_works': '/how-it-works',
+    'about_us': '/about-us',
+}
+
+
+def url_for(endpoint: str, **values) -> str:
+    path = ROUTES[endpoint]
+    return f"{path}?{urlencode(values)}" if values else path
+
+
+templates = Environment(loader=FileSystemLoader('frontend'), autoescape=select_autoescape(['html']))
+templates.globals['url_for'] = url_for
+
+
+class AsyncResumeJobMatcher(ResumeJobMatcher):
+    """ResumeJobMatcher whose LLM-bound stages are coroutines."""
+
+    async def _ainvoke(self, prompt: str, task: str) -> str:
+        return await self.router.ainvoke(task, prompt)
+
+    async def aiter_job_listings(self, job_sites: List[str]) -> AsyncIterator[Dict]:
+        try:
+            for site in job_sites:
+                try:
+                    async for job in self._aiter_site(site):
+                        yield JobListing.coerce(job)
+                except Overloaded:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error scraping {site}: {e}")
+        finally:
+            await asyncio.to_thread(self.registry.prune)
+
+    async def _aiter_site(self, site: str) -> AsyncIterator[Dict]:
+        # Registry calls are SQLite reads and writes, so they stay off the event loop too
+        validators = await asyncio.to_thread(self.registry.page_validators, site)
+        if validators or not await asyncio.to_thread(self.registry.has_page, site):
+            not_modified, validators = await asyncio.to_thread(check_not_modified, site, validators)
+            cached = await asyncio.to_thread(self.registry.lookup_page, site) if not_modified else None
+            if cached is not None:
+                logger.info(f"♻️ {site} not modified, reusing {len(cached)} listings")
+                for job in cached:
+                    yield job
+                return
+
+        page_texts, fingerprints, failed = [], [], 0
+        pages = crawl_pages(site, target_jobs=self.target_jobs, time_budget=self.crawl_budget)
+        async for html in pipeline.athreaded(pages):
+            text = await asyncio.to_thread(clean_body_content, html)
+            page_texts.append(text)
+            # All chunks of a page go to Ollama at once instead of one after another
+            extracted = await asyncio.gather(*(
+                self._aextract_chunk(chunk, site) for chunk in split_dom_content(text)
+            ))
+            for found in extracted:
+                if found is None:
+                    failed += 1
+                    continue
+                for job in found:
+                    fingerprints.append(job_fingerprint(job))
+                    yield job
+        if not page_texts:
+            logger.warning(f"Failed to scrape content from {site}")
+            return
+        if failed:
+            # A partial listing set must not be replayed as the whole page on a 304
+            logger.warning(f"{failed} chunks of {site} failed to extract, not recording the page")
+            return
+        await asyncio.to_thread(self.registry.record_page, site, "\n".join(page_texts), fingerprints, validators)
+
+    async def _aextract_chunk(self, chunk: str, source: str) -> Optional[List[Dict]]:
+        """The chunk's jobs, or None if extraction failed (then nothing is recorded)."""
+        found = await asyncio.to_thread(self.registry.lookup_chunk, chunk)
+        if found is None:
+            job = await self._aextract_job_details(chunk)
+            if job is None:
+                return None
+            found = [job] if job else []
+            await asyncio.to_thread(self.registry.record_chunk, chunk, found, source)
+        return found
+
+    async def _aextract_job_details(self, content: str) -> Optional[Dict]:
+        try:
+            with span("extract"):
+                response = await self._ainvoke(JOB_EXTRACT_PROMPT.format(job_content=content), "job_extraction")
+                # None (not {}) when nothing could be parsed, so the chunk is retried later
+                return self._clean_json_response(response, JOB_DETAILS_SCHEMA) or None
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting job details: {e}")
+            return None
+
+    async def amatch_resume_data_to_jobs(self, resume_data: Dict, job_listings: AsyncIterable[Dict],
+                                         explain_top: int = 5) -> List[Dict]:
+        """Async match_resume_data_to_jobs; each job is scored concurrently as soon as it arrives."""
+        profile = ResumeProfile.coerce(resume_data)
+        resume_details = profile.canonical_json()
+        resume = self._resume_key(profile, resume_details)
+        tasks = []
+        try:
+            async for job in job_listings:
+                tasks.append(asyncio.create_task(self._amatch_job(resume_details, job, resume)))
+            matched_jobs = self._rank(await asyncio.gather(*tasks))
+        except BaseException:
+            # E.g. Overloaded from one job: the request is answered with a 503, so stop
+            # the other scoring calls instead of letting them hold scheduler slots
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        if self.two_phase:
+            with span("explain"):
+                await asyncio.gather(*(
+                    self._aexplain_match(resume_details, matched_job, resume)
+                    for matched_job in matched_jobs[:explain_top]
+                ))
+        return matched_jobs
+
+    @timed("match")
+    async def _amatch_job(self, resume_details: str, job: Dict, resume: Optional[ResumeKey] = None) -> Dict:
+        try:
+            logger.info(f"🧾 Matching job: {job.get('job_title', 'Unknown Title')}")
+            match_data = self._cached_match(job, resume)
+            if match_data is None:
+                if self.two_phase:
+                    match_data = await self._ascore_match(resume_details, job)
+                else:
+                    response = await self._ainvoke(
+                        MATCHING_PROMPT.format(resume_details=resume_details, job_listing=canonical_json(job)),
+                        "match_scoring"
+                    )
+                    match_data = self._clean_json_response(response, MATCH_DETAILS_SCHEMA)
+                self._store_match(job, resume, match_data)
+            return self._with_match_details(job, match_data)
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error matching resume to job: {e}")
+            return self._failed_match(job, e)
+
+    async def _ascore_match(self, resume_details: str, job: Dict) -> Dict:
+        parser = IncrementalJSONParser()
+        prompt = SCORING_PROMPT.format(resume_details=resume_details, job_listing=canonical_json(job))
+        stream = self.router.astream("match_scoring", prompt)
+        try:
+            async for chunk in stream:
+                parser.feed(chunk)
+                if parser.has_fields(SCORE_FIELDS):
+                    break
+        finally:
+            await stream.aclose()
+        if "match_score" not in parser.value:
+            return {}
+        return conform_to_schema(parser.value, MATCH_DETAILS_SCHEMA)
+
+    async def _aexplain_match(self, resume_details: str, matched_job: Dict, resume: Optional[ResumeKey] = None):
+        explanation = self._cached_explanation(matched_job, resume)
+        if explanation is None:
+            try:
+                response = await self._ainvoke(self._explain_prompt(resume_details, matched_job), "match_explanation")
+                explanation = self._clean_json_response(response, MATCH_DETAILS_SCHEMA)
+            except Exception as e:
+                logger.error(f"Error explaining match: {e}")
+                return
+            self._store_explanation(matched_job, resume, explanation)
+        self._apply_explanation(matched_job, explanation)
+
+
+async def _iterate(items: List[Dict]) -> AsyncIterator[Dict]:
+    for item in items:
+        yield item
+
+
+def _save_upload(field: web.FileField, filepath: str):
+    with open(filepath, 'wb') as f:
+        while True:
+            block = field.file.read(64 * 1024)
+            if not block:
+                break
+            f.write(block)
+
+
+def _render(template: str, **context) -> web.Response:
+    return web.Response(text=templates.get_template(template).render(**context), content_type='text/html')
+
+
+def _redirect(endpoint: str, **values) -> web.HTTPFound:
+    return web.HTTPFound(url_for(endpoint, **values))
+
+
+def _page_response(request: web.Request, page: RenderedPage) -> web.Response:
+    status, body, headers = page.response_parts(
+        request.headers.get('If-None-Match'), request.headers.get('Accept-Encoding')
+    )
+    return web.Response(body=body, status=status, headers=headers, content_type='text/html', charset='utf-8')
+
+
+def _static_page(request: web.Request, template: str) -> web.Response:
+    return _page_response(request, STATIC_PAGES.get(template, templates.get_template(template).render))
+
+
+async def index(request: web.Request) -> web.Response:
+    return _static_page(request, 'index.html')
+
+
+async def upload_form(request: web.Request) -> web.Response:
+    return _static_page(request, 'upload.html')
+
+
+async def upload(request: web.Request) -> web.Response:
+    request_id = uuid.uuid4().hex[:12]
+    with request_timer(request_id):
+        return await _handle_upload(request, request_id)
+
+
+async def _handle_upload(request: web.Request, request_id: str) -> web.Response:
+    form = await request.post()
+    file = form.get('resume')
+    if not isinstance(file, web.FileField) or not file.filename:
+        raise _redirect('upload')
+    if not allowed_file(file.filename):
+        raise _redirect('upload')
+
+    # Prefixed so concurrent uploads of files with the same name do not collide
+    filepath = os.path.join(UPLOAD_FOLDER, f"{uuid.uuid4().hex[:8]}_{secure_filename(file.filename)}")
+    await asyncio.to_thread(_save_upload, file, filepath)
+
+    location = str(form.get('location', '')).strip().lower()
+    job_preference = str(form.get('job-preference', '')).strip().lower()
+
+    try:
+        # Parse the resume while jobs are being fetched and extracted
+        resume_task = asyncio.create_task(parse_resume_from_path_async(filepath))
+
+        matcher = request.app['matcher']
+        job_store = await asyncio.to_thread(JobStore)
+        await asyncio.to_thread(job_store.record_request, job_preference, location)
+        stored_jobs = await asyncio.to_thread(
+            job_store.get_jobs, job_preference, location, flask_app.config['JOB_STORE_MAX_AGE']
+        )
+        scraped_jobs = []
+        if stored_jobs is not None:
+            logger.info(f"📦 Using {len(stored_jobs)} pre-crawled jobs from the job store.")
+            job_listings = _iterate(stored_jobs)
+        else:
+            job_sites = [build_search_url(job_preference, location)]
+            logger.info("🔍 Streaming job listings...")
+            job_listings = pipeline.acollect(
+                pipeline.aprefetch(pipeline.aunique(matcher.aiter_job_listings(job_sites))),
+                scraped_jobs
+            )
+
+        filtered_jobs = []
+        filtered_stream = pipeline.acollect(
+            pipeline.afiltered(job_listings, matcher.job_filter(location, job_preference), limit=5),
+            filtered_jobs
+        )
+        try:
+            resume_data = await resume_task
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing resume: {e}")
+            resume_data = {"error": str(e)}
+
+        if 'error' not in resume_data:
+            matched_jobs = await matcher.amatch_resume_data_to_jobs(resume_data, filtered_stream)
+            logger.info(f"✅ Resume matched with {len(matched_jobs)} jobs.")
+        else:
+            logger.error("Failed to parse resume")
+            matched_jobs = []
+            async for _ in filtered_stream:
+                pass
+        logger.info(f"✅ Found {len(filtered_jobs)} jobs after filtering by location & keyword.")
+
+        if scraped_jobs:
+            logger.info(f"✅ Scraped {len(scraped_jobs)} total jobs.")
+            await asyncio.to_thread(job_store.put_jobs, job_preference, location, dedupe_jobs(scraped_jobs))
+
+        if not filtered_jobs:
+            logger.warning("⚠️ No jobs matched the filter.")
+            raise _redirect('upload')
+
+        top_matches = (matched_jobs or filtered_jobs)[:5]
+        await asyncio.to_thread(save_results, request_id, dumps_json_list(top_matches))
+        raise _redirect('results', id=request_id)
+    except web.HTTPException:
+        raise
+    except Overloaded as e:
+        logger.warning(f"Shedding upload: {e}")
+        raise web.HTTPServiceUnavailable(
+            text=f"The server is busy ({e}). Please try again in {e.retry_after} seconds.",
+            headers={'Retry-After': str(e.retry_after)}
+        )
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        raise _redirect('upload')
+    finally:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+
+def _render_results(data: bytes) -> str:
+    return templates.get_template('results.html').render(job_matches=json.loads(data))
+
+
+async def results(request: web.Request) -> web.Response:
+    result_id = request.query.get('id', '')
+    path = results_path(result_id)
+    if path is None:
+        raise web.HTTPNotFound()
+    try:
+        # A hit is a stat and a dict lookup; a miss reads, parses and renders in the worker pool
+        page = await asyncio.to_thread(RESULTS_PAGES.get, result_id, path, _render_results)
+    except FileNotFoundError:
+        raise _redirect('upload')
+    return _page_response(request, page)
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(text=REGISTRY.render_prometheus(), headers={'Content-Type': 'text/plain; version=0.0.4'})
+
+
+def _page(template: str):
+    async def handler(request: web.Request) -> web.Response:
+        return _render(template)
+    return handler
+
+
+def create_app(workers: int = 8) -> web.Application:
+    aio_app = web.Application(client_max_size=flask_app.config['MAX_CONTENT_LENGTH'])
+
+    async def use_worker_pool(aio_app):
+        # Blocking stages share this pool; everything else runs on the event loop
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cvision-io")
+        asyncio.get_running_loop().set_default_executor(executor)
+        yield
+        executor.shutdown(wait=False)
+
+    aio_app.cleanup_ctx.append(use_worker_pool)
+    # One matcher for all requests: building the Ollama client is costly and would run on the event loop
+    aio_app['matcher'] = AsyncResumeJobMatcher()
+    aio_app.router.add_get('/', index)
+    aio_app.router.add_get('/upload', upload_form)
+    aio_app.router.add_post('/upload', upload)
+    aio_app.router.add_get('/results', results)
+    aio_app.router.add_get('/metrics', metrics)
+    aio_app.router.add_get('/login-signup', _page('login-signup.html'))
+    aio_app.router.add_get('/features', _page('features.html'))
+    aio_app.router.add_get('/how-it-works', _page('howitworks.html'))
+    aio_app.router.add_get('/about-us', _page('about-us.html'))
+    return aio_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve CVision on the asyncio event loop")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("ASYNC_WORKERS", 8)),
+                        help="Threads for blocking work (Selenium, PDF parsing, SQLite)")
+    args = parser.parse_args()
+    web.run_app(create_app(args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
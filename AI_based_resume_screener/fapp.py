@@ -1,13 +1,32 @@
+import contextvars
 import os
 import json
 import logging
-from typing import Dict, List, Optional
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from flask import Flask, Response, abort, render_template, request, redirect, send_file, url_for, session, flash
 from werkzeug.utils import secure_filename
-from resume_scraper.resume_processor import parse_resume_from_file
-from resume_scraper.scraper import scrape_website, clean_body_content, split_dom_content
-from langchain_core.prompts import PromptTemplate
-from langchain_ollama import OllamaLLM
+from resume_scraper import pipeline
+from resume_scraper.resume_processor import parse_resume_from_file, parse_resume_from_path
+from resume_scraper.scraper import crawl_pages, check_not_modified, build_search_url
+from resume_scraper.job_store import JobStore
+from resume_scraper.listing_registry import ListingRegistry, dedupe_jobs, job_fingerprint
+from resume_scraper.match_cache import MATCH_CACHE, MatchCache, ResumeKey
+from resume_scraper.models import JobListing, MatchResult, ResumeProfile, canonical_json, dumps_json_list
+from resume_scraper.page_cache import RESULTS_PAGES, STATIC_PAGES, RenderedPage, results_path, save_results
+from resume_scraper.structured_output import (
+    parse_json_response, conform_to_schema, IncrementalJSONParser,
+    JOB_DETAILS_SCHEMA, MATCH_DETAILS_SCHEMA
+)
+from resume_scraper.llm_router import LLMRouter, LangChainBackend
+from resume_scraper.llm_scheduler import Overloaded
+from resume_scraper.metrics import REGISTRY, span, timed, request_timer
+from resume_scraper.profiling import (
+    requested_mode, profile_request, profile_path, run_profiled, folded_to_tree, flatten_tree
+)
+# langchain is imported on the first prompt / LLM call, not at startup
+from resume_scraper.lazy import LazyPromptTemplate, ollama_factory
 
 # Configure logging
 logging.basicConfig(
@@ -21,37 +40,22 @@ app.secret_key = os.urandom(24).hex()  # Secure random secret key
 app.config['UPLOAD_FOLDER'] = 'upload'
 app.config['ALLOWED_EXTENSIONS'] = {'pdf', 'docx', 'doc', 'rtf'}
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
+# Profile every /upload ("cprofile" or "sampling"); otherwise only requests sending X-Profile
+app.config['PROFILE_UPLOADS'] = os.getenv('PROFILE_UPLOADS', '')
+# Jobs pre-crawled by resume_scraper.crawler younger than this are used instead of scraping live
+app.config['JOB_STORE_MAX_AGE'] = int(os.getenv('JOB_STORE_MAX_AGE', 6 * 3600))
 
 # Ensure directories exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs('output', exist_ok=True)
 
-class ResumeJobMatcher:
-    def __init__(self, model_name="llama3.2"):
-        self.llm = OllamaLLM(model=model_name)
-        
-    def scrape_job_listings(self, job_sites: List[str]) -> List[Dict]:
-        job_listings = []
-        for site in job_sites:
-            try:
-                html_content = scrape_website(site)
-                if not html_content:
-                    logger.warning(f"Failed to scrape content from {site}")
-                    continue
-                cleaned_content = clean_body_content(html_content)
-                split_contents = split_dom_content(cleaned_content)
-                for content in split_contents:
-                    job_listing = self._extract_job_details(content)
-                    if job_listing:
-                        job_listings.append(job_listing)
-            except Exception as e:
-                logger.error(f"Error scraping {site}: {e}")
-        return job_listings
-    
-    def _extract_job_details(self, content: str) -> Optional[Dict]:
-        job_extract_prompt = PromptTemplate(
-            input_variables=["job_content"],
-            template="""Extract structured job details from the following job listing content:
+# Fields needed to rank a match vs. the verbose ones only shown on the results page
+SCORE_FIELDS = ["match_score", "matched_skills", "missing_skills"]
+EXPLANATION_FIELDS = ["match_reasoning", "matched_experience", "improvement_suggestions", "additional_comments"]
+
+JOB_EXTRACT_PROMPT = LazyPromptTemplate(
+    input_variables=["job_content"],
+    template="""Extract structured job details from the following job listing content:
 
 Content: {job_content}
 
@@ -67,41 +71,11 @@ Please provide a JSON response with the following structure:
 }}
 
 Ensure the response is a valid JSON object. If information is not found, use empty strings or empty lists."""
-        )
-        try:
-            response = self.llm.invoke(job_extract_prompt.format(job_content=content))
-            return self._clean_json_response(response)
-        except Exception as e:
-            logger.error(f"Error extracting job details: {e}")
-            return None
+)
 
-    def _clean_json_response(self, response: str) -> Dict:
-        import re
-        response = response.replace("```json", "").replace("```", "").strip()
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            try:
-                start = response.index('{')
-                end = response.rindex('}') + 1
-                json_str = response[start:end]
-                json_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', json_str)
-                return json.loads(json_str)
-            except (ValueError, json.JSONDecodeError) as e:
-                logger.error("Could not parse job details JSON")
-                logger.error(f"Error: {e}")
-                logger.error(f"Raw LLM Response: {response}")
-                return {}
-
-    def match_resume_to_jobs(self, resume_file, job_listings: List[Dict]) -> List[Dict]:
-        resume_data = parse_resume_from_file(resume_file)
-        if 'error' in resume_data:
-            logger.error("Failed to parse resume")
-            return []
-        
-        matching_prompt = PromptTemplate(
-            input_variables=["resume_details", "job_listing"],
-            template="""Compare the following resume details with a job listing and provide a match score and reasoning:
+MATCHING_PROMPT = LazyPromptTemplate(
+    input_variables=["resume_details", "job_listing"],
+    template="""Compare the following resume details with a job listing and provide a match score and reasoning:
 
 Resume Details:
 {resume_details}
@@ -130,58 +104,342 @@ Evaluation Criteria:
 - Ensure the response is a valid JSON object.
 - Make sure to include all relevant details from the resume and job listing.
 """
+)
+
+SCORING_PROMPT = LazyPromptTemplate(
+    input_variables=["resume_details", "job_listing"],
+    template="""Compare the following resume details with a job listing and score the match:
+
+Resume Details:
+{resume_details}
+
+Job Listing:
+{job_listing}
+
+Please provide a JSON response with exactly these fields, in this order:
+{{
+    "match_score": 0-100,
+    "matched_skills": [],
+    "missing_skills": []
+}}
+
+Evaluation Criteria:
+- Compare skills, experience, and job requirements
+- Consider both technical and soft skills
+- Give a score of 0-100 based on the match
+- Ensure the response is a valid JSON object.
+"""
+)
+
+EXPLAIN_PROMPT = LazyPromptTemplate(
+    input_variables=["resume_details", "job_listing", "score_details"],
+    template="""A resume was scored against a job listing. Explain the result.
+
+Resume Details:
+{resume_details}
+
+Job Listing:
+{job_listing}
+
+Score:
+{score_details}
+
+Please provide a JSON response with:
+{{
+    "match_reasoning": "",
+    "matched_experience": [],
+    "improvement_suggestions": [],
+    "additional_comments": "Provide any additional comments or insights about the match."
+}}
+
+Ensure the response is a valid JSON object and is consistent with the score given.
+"""
+)
+
+class ResumeJobMatcher:
+    def __init__(self, model_name="llama3.2", two_phase: bool = True, target_jobs: int = 50,
+                 crawl_budget: float = 60, router: Optional[LLMRouter] = None,
+                 match_cache: Optional[MatchCache] = MATCH_CACHE):
+        # format="json" puts Ollama in JSON mode so responses are a single object
+        self.router = router or LLMRouter({
+            "ollama": LangChainBackend("ollama", client_factory=ollama_factory(model_name, format="json"))
+        })
+        self.two_phase = two_phase
+        self.registry = ListingRegistry()
+        # Stop paging through search results after this many job cards or seconds
+        self.target_jobs = target_jobs
+        self.crawl_budget = crawl_budget
+        # Shared by every matcher in the process; None scores every pair with the LLM
+        self.match_cache = match_cache
+
+    @property
+    def llm(self):
+        """Client behind the "ollama" backend; assign a fake to benchmark without Ollama."""
+        return self.router.backends["ollama"].client
+
+    @llm.setter
+    def llm(self, client):
+        self.router.backends["ollama"].client = client
+
+    def _invoke(self, prompt: str, task: str) -> str:
+        return self.router.invoke(task, prompt)
+        
+    def scrape_job_listings(self, job_sites: List[str]) -> List[Dict]:
+        return dedupe_jobs(list(self.iter_job_listings(job_sites)))
+
+    def iter_job_listings(self, job_sites: List[str]) -> Iterator[Dict]:
+        """
+        Stream extracted jobs site by site. Pages are cleaned, split and
+        extracted as they arrive, so the first jobs are available long before
+        the crawl finishes, and nothing more is crawled once the consumer stops.
+        """
+        try:
+            for site in job_sites:
+                try:
+                    for job in self._iter_site(site):
+                        yield JobListing.coerce(job)
+                except Overloaded:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error scraping {site}: {e}")
+        finally:
+            self.registry.prune()
+
+    def _iter_site(self, site: str) -> Iterator[Dict]:
+        """
+        Stream one site's jobs, reusing earlier extractions for pages and
+        chunks that have not changed since they were last seen.
+        """
+        validators = self.registry.page_validators(site)
+        if validators:
+            not_modified, validators = check_not_modified(site, validators)
+            cached = self.registry.lookup_page(site) if not_modified else None
+            if cached is not None:
+                logger.info(f"♻️ {site} not modified, reusing {len(cached)} listings")
+                yield from cached
+                return
+        elif not self.registry.has_page(site):
+            # First visit: learn whether the site sends ETag / Last-Modified at all
+            _, validators = check_not_modified(site, {})
+
+        page_texts, fingerprints, failed = [], [], []
+        pages = pipeline.collect(
+            pipeline.cleaned(crawl_pages(site, target_jobs=self.target_jobs, time_budget=self.crawl_budget)),
+            page_texts
         )
+        for job in pipeline.jobs(pipeline.segments(pages), self._extract_job_details, self.registry,
+                                 source=site, failed=failed):
+            fingerprints.append(job_fingerprint(job))
+            yield job
+        if not page_texts:
+            logger.warning(f"Failed to scrape content from {site}")
+            return
+        if failed:
+            # A partial listing set must not be replayed as the whole page on a 304
+            logger.warning(f"{len(failed)} chunks of {site} failed to extract, not recording the page")
+            return
+        self.registry.record_page(site, "\n".join(page_texts), fingerprints, validators)
+    
+    def _extract_job_details(self, content: str) -> Optional[Dict]:
+        try:
+            with span("extract"):
+                response = self._invoke(JOB_EXTRACT_PROMPT.format(job_content=content), "job_extraction")
+                # None (not {}) when nothing could be parsed, so the chunk is retried later
+                return self._clean_json_response(response, JOB_DETAILS_SCHEMA) or None
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting job details: {e}")
+            return None
 
-        matched_jobs = []
-        for job in job_listings:
-            try:
-                logger.info(f"🧾 Matching job: {job.get('job_title', 'Unknown Title')}")
-                match_result = self.llm.invoke(
-                    matching_prompt.format(
-                        resume_details=json.dumps(resume_data),
-                        job_listing=json.dumps(job)
-                    )
-                )
-                logger.debug(f"LLM raw output: {match_result}")
-
-                match_data = self._clean_json_response(match_result)
-                matched_job = {**job, "match_details": match_data or {
-                    "match_score": 0,
-                    "matched_skills": [],
-                    "missing_skills": [],
-                    "match_reasoning": "No match data available.",
-                    "matched_experience": [],
-                    "improvement_suggestions": [],
-                    "additional_comments": ""
-                }}
-                matched_jobs.append(matched_job)
-            except Exception as e:
-                logger.error(f"Error matching resume to job: {e}")
-                matched_jobs.append({
-                    **job,
-                    "match_details": {
-                        "match_score": 0,
-                        "matched_skills": [],
-                        "missing_skills": [],
-                        "match_reasoning": "Error during matching.",
-                        "matched_experience": [],
-                        "improvement_suggestions": [],
-                        "additional_comments": str(e)
-                    }
-                })
-
-        matched_jobs.sort(
+    def _clean_json_response(self, response: str, schema: Optional[Dict] = None) -> Dict:
+        return parse_json_response(response, schema)
+
+    def match_resume_to_jobs(self, resume_file, job_listings: List[Dict], explain_top: int = 5) -> List[Dict]:
+        resume_data = parse_resume_from_file(resume_file)
+        if 'error' in resume_data:
+            logger.error("Failed to parse resume")
+            return []
+        return self.match_resume_data_to_jobs(resume_data, job_listings, explain_top=explain_top)
+
+    def match_resume_data_to_jobs(self, resume_data: Dict, job_listings: Iterable[Dict], explain_top: int = 5) -> List[Dict]:
+        """
+        Score a parsed resume against job listings and rank them.
+
+        ``job_listings`` may be a stream (e.g. from iter_job_listings); each job
+        is scored as soon as it arrives. With two-phase scoring only the score
+        fields are generated for every job (streamed, stopping as soon as they
+        are complete); the verbose explanation is then generated for the
+        ``explain_top`` best matches only.
+        """
+        # Serialized once per resume; ResumeProfile keeps it cached across calls (e.g. batch screening)
+        profile = ResumeProfile.coerce(resume_data)
+        resume_details = profile.canonical_json()
+        resume = self._resume_key(profile, resume_details)
+        matched_jobs = self._rank(pipeline.scored(
+            job_listings, lambda job: self._match_job(resume_details, job, resume)
+        ))
+        if self.two_phase:
+            with span("explain"):
+                for matched_job in matched_jobs[:explain_top]:
+                    self._explain_match(resume_details, matched_job, resume)
+        return matched_jobs
+
+    def _resume_key(self, profile: ResumeProfile, resume_details: str) -> Optional[ResumeKey]:
+        if self.match_cache is None or not self.match_cache.enabled:
+            return None
+        return self.match_cache.resume_key(profile, resume_details)
+
+    @property
+    def _match_kind(self) -> str:
+        return "score" if self.two_phase else "full"
+
+    def _cached_match(self, job: Dict, resume: Optional[ResumeKey]) -> Optional[Dict]:
+        if resume is None:
+            return None
+        # Two-phase scores may come from a similar resume: only its match score is kept and
+        # the skill lists are redone for this resume; full matches include reasoning about
+        # this resume and are only reused exactly
+        cached = self.match_cache.get(self._match_kind, job, resume, similar=self.two_phase)
+        if cached is not None:
+            logger.debug(f"♻️ Reusing cached match for {job.get('job_title', 'Unknown Title')}")
+            return conform_to_schema(cached, MATCH_DETAILS_SCHEMA)
+        return None
+
+    def _store_match(self, job: Dict, resume: Optional[ResumeKey], match_data: Dict):
+        if resume is None or "match_score" not in (match_data or {}):
+            return
+        if self.two_phase:
+            match_data = {field: match_data.get(field) for field in SCORE_FIELDS}
+        self.match_cache.put(self._match_kind, job, resume, match_data)
+
+    @timed("match")
+    def _match_job(self, resume_details: str, job: Dict, resume: Optional[ResumeKey] = None) -> Dict:
+        try:
+            logger.info(f"🧾 Matching job: {job.get('job_title', 'Unknown Title')}")
+            match_data = self._cached_match(job, resume)
+            if match_data is None:
+                if self.two_phase:
+                    match_data = self._score_match(resume_details, job)
+                else:
+                    match_data = self._full_match(resume_details, job)
+                self._store_match(job, resume, match_data)
+            return self._with_match_details(job, match_data)
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error matching resume to job: {e}")
+            return self._failed_match(job, e)
+
+    @staticmethod
+    def _with_match_details(job: Dict, match_data: Dict) -> MatchResult:
+        return MatchResult(job, match_data or {
+            "match_score": 0,
+            "matched_skills": [],
+            "missing_skills": [],
+            "match_reasoning": "No match data available.",
+            "matched_experience": [],
+            "improvement_suggestions": [],
+            "additional_comments": ""
+        })
+
+    @staticmethod
+    def _failed_match(job: Dict, error: Exception) -> MatchResult:
+        return MatchResult(job, {
+            "match_score": 0,
+            "matched_skills": [],
+            "missing_skills": [],
+            "match_reasoning": "Error during matching.",
+            "matched_experience": [],
+            "improvement_suggestions": [],
+            "additional_comments": str(error)
+        })
+
+    @staticmethod
+    def _rank(matched_jobs: List[Dict]) -> List[Dict]:
+        return sorted(
+            matched_jobs,
             key=lambda x: x.get("match_details", {}).get("match_score", 0),
             reverse=True
         )
-        return matched_jobs
+
+    def _full_match(self, resume_details: str, job: Dict) -> Dict:
+        match_result = self._invoke(
+            MATCHING_PROMPT.format(resume_details=resume_details, job_listing=canonical_json(job)),
+            "match_scoring"
+        )
+        logger.debug(f"LLM raw output: {match_result}")
+        return self._clean_json_response(match_result, MATCH_DETAILS_SCHEMA)
+
+    def _score_match(self, resume_details: str, job: Dict) -> Dict:
+        """Phase one: stream the score fields and stop once they are complete."""
+        parser = IncrementalJSONParser()
+        prompt = SCORING_PROMPT.format(resume_details=resume_details, job_listing=canonical_json(job))
+        stream = self.router.stream("match_scoring", prompt)
+        try:
+            for chunk in stream:
+                parser.feed(chunk)
+                if parser.has_fields(SCORE_FIELDS):
+                    break
+        finally:
+            # Closing the generator drops the connection so Ollama stops generating
+            stream.close()
+        logger.debug(f"LLM raw output: {parser.buffer}")
+        if "match_score" not in parser.value:
+            return {}
+        return conform_to_schema(parser.value, MATCH_DETAILS_SCHEMA)
+
+    def _explain_match(self, resume_details: str, matched_job: Dict, resume: Optional[ResumeKey] = None):
+        """Phase two: fill in the verbose fields for a match that will be shown."""
+        explanation = self._cached_explanation(matched_job, resume)
+        if explanation is None:
+            try:
+                response = self._invoke(self._explain_prompt(resume_details, matched_job), "match_explanation")
+                explanation = self._clean_json_response(response, MATCH_DETAILS_SCHEMA)
+            except Exception as e:
+                # Includes Overloaded: the match is still shown, just without the explanation
+                logger.error(f"Error explaining match: {e}")
+                return
+            self._store_explanation(matched_job, resume, explanation)
+        self._apply_explanation(matched_job, explanation)
+
+    def _cached_explanation(self, matched_job: MatchResult, resume: Optional[ResumeKey]) -> Optional[Dict]:
+        # Explanations are written about one resume: exact matches only
+        return self.match_cache.get("explain", matched_job.job, resume) if resume is not None else None
+
+    def _store_explanation(self, matched_job: MatchResult, resume: Optional[ResumeKey], explanation: Dict):
+        if resume is not None and any(explanation.get(field) for field in EXPLANATION_FIELDS):
+            self.match_cache.put("explain", matched_job.job, resume,
+                                 {field: explanation.get(field) for field in EXPLANATION_FIELDS})
+
+    @staticmethod
+    def _explain_prompt(resume_details: str, matched_job: MatchResult) -> str:
+        score_details = {field: matched_job.details.get(field) for field in SCORE_FIELDS}
+        return EXPLAIN_PROMPT.format(
+            resume_details=resume_details,
+            job_listing=matched_job.job.canonical_json(),
+            score_details=canonical_json(score_details)
+        )
+
+    @staticmethod
+    def _apply_explanation(matched_job: MatchResult, explanation: Dict):
+        for field in EXPLANATION_FIELDS:
+            if explanation.get(field):
+                matched_job.details[field] = explanation[field]
 
     def filter_jobs(self, job_listings, location="", keyword=""):
-        filtered = []
+        return list(self.iter_filtered_jobs(job_listings, location, keyword, limit=5))
+
+    def iter_filtered_jobs(self, job_listings: Iterable[Dict], location="", keyword="", limit: Optional[int] = 5) -> Iterator[Dict]:
+        """Stream jobs matching location and keyword; stops reading job_listings after ``limit``."""
+        return pipeline.filtered(job_listings, self.job_filter(location, keyword), limit=limit)
+
+    @staticmethod
+    def job_filter(location="", keyword="") -> Callable[[Dict], bool]:
         location = location.lower()
         keyword = keyword.lower()
 
-        for job in job_listings:
+        def matches(job):
             job_location = str(job.get("location", "")).lower()
             job_title = str(job.get("job_title", "")).lower()
             job_description = str(job.get("description", "")).lower()
@@ -192,102 +450,174 @@ Evaluation Criteria:
                 keyword in job_description or 
                 any(keyword in req.lower() for req in job.get("requirements", []))
             )
+            return location_match and keyword_match
 
-            if location_match and keyword_match:
-                filtered.append(job)
+        return matches
 
-        return filtered[:5]
+def overloaded_response(error: Overloaded) -> Response:
+    """503 telling the client the LLM queue is over its latency budget and when to retry."""
+    return Response(
+        f"The server is busy ({error}). Please try again in {error.retry_after} seconds.",
+        status=503,
+        mimetype='text/plain',
+        headers={'Retry-After': str(error.retry_after)}
+    )
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+def page_response(page: RenderedPage) -> Response:
+    """Serve a cached page, compressed if the client accepts it, or 304 if its copy is current."""
+    status, body, headers = page.response_parts(
+        request.headers.get('If-None-Match'), request.headers.get('Accept-Encoding')
+    )
+    return Response(body, status=status, headers=headers, mimetype='text/html')
+
+def static_page(template: str) -> Response:
+    return page_response(STATIC_PAGES.get(template, lambda: render_template(template)))
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return static_page('index.html')
 
 @app.route('/upload', methods=['GET', 'POST'])
 def upload():
     if request.method == 'POST':
-        # Validate file upload
-        if 'resume' not in request.files:
-            flash('No file part in the request', 'error')
-            return redirect(url_for('upload'))
-        
-        file = request.files['resume']
-        if file.filename == '':
-            flash('No selected file', 'error')
-            return redirect(url_for('upload'))
-        
-        if not allowed_file(file.filename):
-            flash('File type not allowed. Please upload PDF, DOCX, DOC, or RTF.', 'error')
-            return redirect(url_for('upload'))
+        request_id = uuid.uuid4().hex[:12]
+        profile_mode = requested_mode(request.headers.get('X-Profile'), app.config['PROFILE_UPLOADS'])
+        with request_timer(request_id):
+            if not profile_mode:
+                return _handle_upload(request_id)
+            with profile_request(request_id, mode=profile_mode):
+                response = _handle_upload(request_id)
+            response.headers['X-Profile-Id'] = request_id
+            return response
+
+    return static_page('upload.html')
+
+def _handle_upload(request_id: str):
+    # Validate file upload
+    if 'resume' not in request.files:
+        flash('No file part in the request', 'error')
+        return redirect(url_for('upload'))
+    
+    file = request.files['resume']
+    if file.filename == '':
+        flash('No selected file', 'error')
+        return redirect(url_for('upload'))
+    
+    if not allowed_file(file.filename):
+        flash('File type not allowed. Please upload PDF, DOCX, DOC, or RTF.', 'error')
+        return redirect(url_for('upload'))
 
-        # Save file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        logger.debug(f"File saved to: {filepath}")
+    # Save file
+    # Prefixed with the request ID so concurrent uploads of the same file name do not clobber each other
+    filename = f"{request_id}_{secure_filename(file.filename)}"
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    file.save(filepath)
+    logger.debug(f"File saved to: {filepath}")
 
-        # Get form data
-        location = request.form.get('location', '').strip().lower()
-        job_preference = request.form.get('job-preference', '').strip().lower()
+    # Get form data
+    location = request.form.get('location', '').strip().lower()
+    job_preference = request.form.get('job-preference', '').strip().lower()
 
-        try:
-            # Process resume and get matches
-            matcher = ResumeJobMatcher()
-            job_sites = [
-                f"https://www.linkedin.com/jobs/search/?keywords={job_preference.replace(' ', '%20')}&location={location.replace(' ', '%20')}"
-            ]
-            logger.info("🔍 Scraping job listings...")
-            job_listings = matcher.scrape_job_listings(job_sites)
-            logger.info(f"✅ Scraped {len(job_listings)} total jobs.")
-
-            logger.info("🧠 Filtering job listings...")
-            filtered_jobs = matcher.filter_jobs(job_listings, location=location, keyword=job_preference)
-            logger.info(f"✅ Found {len(filtered_jobs)} jobs after filtering by location & keyword.")
-
-            if not filtered_jobs:
-                logger.warning("⚠️ No jobs matched the filter. Saving empty result.")
-                flash('No jobs matched your criteria.', 'error')
-                os.remove(filepath)
-                return redirect(url_for('upload'))
-
-            with open(filepath, 'rb') as resume_file:
-                logger.info("Matching resume to jobs...")
-                matched_jobs = matcher.match_resume_to_jobs(resume_file, filtered_jobs)
-                logger.info(f"✅ Resume matched with {len(matched_jobs)} jobs.")
-
-            os.remove(filepath)  # Clean up uploaded file
-
-            if not matched_jobs:
-                logger.warning("⚠️ LLM returned no valid matches. Using filtered jobs instead.")
-                matched_jobs = filtered_jobs
-
-            # Save top matches
-            top_matches = matched_jobs[:5]
-            with open('output/top_5_matched_jobs.json', 'w') as f:
-                json.dump(top_matches, f, indent=2)
-            logger.info("💾 Top 5 job matches saved to output/top_5_matched_jobs.json")
-
-            flash('Resume uploaded and processed successfully!', 'success')
-            return redirect(url_for('results'))
+    try:
+        # Parse the resume while jobs are being fetched and extracted
+        resume_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="resume-parse")
+        resume_future = resume_pool.submit(contextvars.copy_context().run, run_profiled, parse_resume_from_path, filepath)
+        resume_pool.shutdown(wait=False)
+
+        matcher = ResumeJobMatcher()
+        job_store = JobStore()
+        job_store.record_request(job_preference, location)
+        stored_jobs = job_store.get_jobs(job_preference, location, app.config['JOB_STORE_MAX_AGE'])
+        scraped_jobs = []
+        if stored_jobs is not None:
+            logger.info(f"📦 Using {len(stored_jobs)} pre-crawled jobs from the job store.")
+            job_listings = iter(stored_jobs)
+        else:
+            job_sites = [build_search_url(job_preference, location)]
+            logger.info("🔍 Streaming job listings...")
+            job_listings = pipeline.collect(
+                pipeline.prefetch(pipeline.unique(matcher.iter_job_listings(job_sites))),
+                scraped_jobs
+            )
 
+        # Jobs are filtered and matched as they are extracted; the stream stops
+        # pulling (and crawling) as soon as enough jobs pass the filter
+        filtered_jobs = []
+        filtered_stream = pipeline.collect(
+            matcher.iter_filtered_jobs(job_listings, location=location, keyword=job_preference),
+            filtered_jobs
+        )
+        try:
+            resume_data = resume_future.result()
+        except Overloaded:
+            raise
         except Exception as e:
-            logger.error(f"Error processing resume: {e}")
-            flash(f'Error processing resume: {str(e)}', 'error')
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            logger.error(f"Error parsing resume: {e}")
+            resume_data = {"error": str(e)}
+
+        if 'error' not in resume_data:
+            logger.info("Matching resume to jobs...")
+            matched_jobs = matcher.match_resume_data_to_jobs(resume_data, filtered_stream)
+            logger.info(f"✅ Resume matched with {len(matched_jobs)} jobs.")
+        else:
+            logger.error("Failed to parse resume")
+            matched_jobs = []
+            for _ in filtered_stream:
+                pass
+        logger.info(f"✅ Found {len(filtered_jobs)} jobs after filtering by location & keyword.")
+
+        if scraped_jobs:
+            logger.info(f"✅ Scraped {len(scraped_jobs)} total jobs.")
+            job_store.put_jobs(job_preference, location, dedupe_jobs(scraped_jobs))
+
+        os.remove(filepath)  # Clean up uploaded file
+
+        if not filtered_jobs:
+            logger.warning("⚠️ No jobs matched the filter. Saving empty result.")
+            flash('No jobs matched your criteria.', 'error')
             return redirect(url_for('upload'))
 
-    return render_template('upload.html')
+        if not matched_jobs:
+            logger.warning("⚠️ LLM returned no valid matches. Using filtered jobs instead.")
+            matched_jobs = filtered_jobs
+
+        # Save top matches under this request's ID so the results page can be cached per result
+        top_matches = matched_jobs[:5]
+        save_results(request_id, dumps_json_list(top_matches))
+        logger.info(f"💾 Top 5 job matches saved as result {request_id}")
+
+        flash('Resume uploaded and processed successfully!', 'success')
+        return redirect(url_for('results', id=request_id))
+
+    except Overloaded as e:
+        logger.warning(f"Shedding upload {request_id}: {e}")
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return overloaded_response(e)
+
+    except Exception as e:
+        logger.error(f"Error processing resume: {e}")
+        flash(f'Error processing resume: {str(e)}', 'error')
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return redirect(url_for('upload'))
+
+def _render_results(data: bytes) -> str:
+    job_matches = json.loads(data)
+    logger.debug(f"Rendering results page with {len(job_matches)} matches")
+    return render_template('results.html', job_matches=job_matches)
 
 @app.route('/results')
 def results():
+    result_id = request.args.get('id', '')
+    path = results_path(result_id)
+    if path is None:
+        abort(404)
     try:
-        with open('output/top_5_matched_jobs.json', 'r') as f:
-            job_matches = json.load(f)
-        logger.info(f"Job matches data: {json.dumps(job_matches, indent=2)}")
-        return render_template('results.html', job_matches=job_matches)
+        return page_response(RESULTS_PAGES.get(result_id, path, _render_results))
     except FileNotFoundError:
         flash('No job matches found. Please upload your resume first.', 'error')
         return redirect(url_for('upload'))
@@ -296,6 +626,44 @@ def results():
         flash(f'Error loading results: {str(e)}', 'error')
         return redirect(url_for('upload'))
 
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/profiles/<request_id>')
+def profile_view(request_id):
+    folded_path = profile_path(request_id, '.folded')
+    summary_path = profile_path(request_id, '.txt')
+    if not folded_path:
+        abort(404)
+    frames, summary = [], None
+    if os.path.exists(folded_path):
+        with open(folded_path) as f:
+            frames = flatten_tree(folded_to_tree(f.read()))
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            summary = f.read()
+    if not os.path.exists(folded_path) and summary is None:
+        abort(404)
+    downloads = [kind for kind in ('prof', 'folded', 'txt') if os.path.exists(profile_path(request_id, '.' + kind))]
+    return render_template(
+        'profile.html',
+        request_id=request_id,
+        frames=frames,
+        max_depth=max((frame['depth'] for frame in frames), default=0),
+        summary=summary,
+        downloads=downloads
+    )
+
+@app.route('/profiles/<request_id>/<kind>')
+def profile_download(request_id, kind):
+    if kind not in ('prof', 'folded', 'txt'):
+        abort(404)
+    path = profile_path(request_id, '.' + kind)
+    if not path or not os.path.exists(path):
+        abort(404)
+    return send_file(os.path.abspath(path), as_attachment=True)
+
 @app.route('/login-signup')
 def login_signup():
     return render_template('login-signup.html')
@@ -0,0 +1,329 @@
+# batch.py
+"""
+Bulk resume screening: rank many resumes against one set of job listings.
+
+Resumes are parsed in parallel, every (resume, job) pair gets a cheap
+vectorized pre-rank score, and only each resume's ``top_k`` jobs are scored
+by the LLM. Rows are streamed to CSV or JSONL as each resume finishes, and
+a checkpoint file lets an interrupted run pick up where it stopped.
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.batch resumes/ --jobs output/job_listings.json --out output/screening.jsonl
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from resume_scraper.llm_scheduler import BATCH, llm_priority
+from resume_scraper.models import JobListing, ResumeProfile, read_records
+from resume_scraper.resume_processor import parse_resume_from_path
+
+logger = logging.getLogger(__name__)
+
+RESUME_EXTENSIONS = (".pdf",)
+OUTPUT_FIELDS = [
+    "resume", "job_index", "job_title", "company", "location",
+    "prerank_score", "match_score", "matched_skills", "missing_skills", "error"
+]
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def collect_resumes(source: str, extract_dir: str) -> List[str]:
+    """
+    Resolve a PDF, a directory of PDFs or a .zip/.tar(.gz) archive of PDFs to
+    a sorted list of file paths. Archives are unpacked into ``extract_dir``.
+    """
+    if os.path.isdir(source):
+        root = source
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(extract_dir)
+        root = extract_dir
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            archive.extractall(extract_dir, filter="data")
+        root = extract_dir
+    elif source.lower().endswith(RESUME_EXTENSIONS):
+        return [source]
+    else:
+        raise ValueError(f"Unsupported resume source: {source}")
+
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(RESUME_EXTENSIONS) and not filename.startswith("."):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def resume_key(path: str) -> str:
+    """Stable ID for a resume file, used for checkpointing."""
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    return f"{os.path.basename(path)}:{digest}"
+
+
+def _tokens(*values) -> Set[str]:
+    tokens = set()
+    for value in values:
+        if isinstance(value, dict):
+            tokens |= _tokens(*value.values())
+        elif isinstance(value, list):
+            tokens |= _tokens(*value)
+        elif value:
+            tokens.update(_TOKEN.findall(str(value).lower()))
+    return tokens
+
+
+def resume_terms(resume_data: Dict) -> Set[str]:
+    return _tokens(
+        resume_data.get("Technical Skills"),
+        resume_data.get("Soft Skills"),
+        resume_data.get("Certifications"),
+        [project.get("Technologies") for project in resume_data.get("Projects", []) if isinstance(project, dict)],
+        [job.get("Position") for job in resume_data.get("Work Experience", []) if isinstance(job, dict)],
+    )
+
+
+def job_terms(job: Dict) -> Set[str]:
+    return _tokens(job.get("job_title"), job.get("requirements"), job.get("skills_required"), job.get("description"))
+
+
+class JobMatrix:
+    """Binary term vectors for a fixed job set, built once per run."""
+
+    def __init__(self, jobs: List[Dict]):
+        self.jobs = jobs
+        term_sets = [job_terms(job) for job in jobs]
+        self.vocabulary = {term: i for i, term in enumerate(sorted(set().union(*term_sets)))} if term_sets else {}
+        self.matrix = np.zeros((len(jobs), len(self.vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(term_sets):
+            self.matrix[row, [self.vocabulary[t] for t in terms]] = 1.0
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.where(norms == 0, 1, norms)
+
+    def vectorize(self, resumes: List[Dict]) -> np.ndarray:
+        vectors = np.zeros((len(resumes), len(self.vocabulary)), dtype=np.float32)
+        for row, resume_data in enumerate(resumes):
+            columns = [self.vocabulary[t] for t in resume_terms(resume_data) if t in self.vocabulary]
+            vectors[row, columns] = 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def prerank(self, resumes: List[Dict]) -> np.ndarray:
+        """Cosine similarity matrix of shape (len(resumes), len(jobs)), scaled to 0-100."""
+        return self.vectorize(resumes) @ self.matrix.T * 100
+
+
+class ResultWriter:
+    """Appends result rows as CSV or JSONL, flushing after every resume."""
+
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="")
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS)
+            if new_file:
+                self.csv.writeheader()
+
+    def write(self, rows: List[Dict]):
+        for row in rows:
+            if self.csv:
+                self.csv.writerow({
+                    k: "; ".join(v) if isinstance(v, list) else v for k, v in row.items()
+                })
+            else:
+                self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def _score_resume(matcher, name: str, resume_data: Dict, jobs: List[Dict], prerank: np.ndarray,
+                  top_k: int) -> List[Dict]:
+    top = [int(i) for i in np.argsort(-prerank)[:top_k]] if top_k else []
+    scored = {}
+    if matcher is not None:
+        for job_index in top:
+            # Score only; explanations are not part of the screening output
+            match = matcher.match_resume_data_to_jobs(resume_data, [jobs[job_index]], explain_top=0)
+            scored[job_index] = match[0]["match_details"]
+
+    rows = []
+    for job_index, job in enumerate(jobs):
+        details = scored.get(job_index)
+        rows.append({
+            "resume": name,
+            "job_index": job_index,
+            "job_title": job.get("job_title", ""),
+            "company": job.get("company", ""),
+            "location": job.get("location", ""),
+            "prerank_score": round(float(prerank[job_index]), 2),
+            "match_score": details.get("match_score") if details else None,
+            "matched_skills": details.get("matched_skills", []) if details else [],
+            "missing_skills": details.get("missing_skills", []) if details else [],
+            "error": None,
+        })
+    rows.sort(key=lambda r: (r["match_score"] is None, -(r["match_score"] or 0), -r["prerank_score"]))
+    return rows
+
+
+def _error_row(path: str, error: str) -> Dict:
+    return {**{field: None for field in OUTPUT_FIELDS}, "resume": os.path.basename(path), "error": error}
+
+
+def _at_batch_priority(func, *args):
+    # Pool threads do not inherit the caller's context, so set the priority here
+    with llm_priority(BATCH):
+        return func(*args)
+
+
+def screen_resumes(resume_paths: List[str], jobs: List[Dict], matcher=None, top_k: int = 5,
+                   parse_workers: int = 4, llm_workers: int = 2,
+                   done: Optional[Set[str]] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Screen resumes against ``jobs``, yielding ``(resume_key, rows)`` per resume
+    as soon as it is finished.
+
+    Args:
+        resume_paths (List[str]): PDF files to screen
+        jobs (List[Dict]): Extracted job listings, shared by every resume
+        matcher: ResumeJobMatcher used for LLM scoring; None for pre-rank only
+        top_k (int): Jobs per resume sent to the LLM
+        parse_workers (int): Resumes parsed in parallel
+        llm_workers (int): Resumes scored by the LLM in parallel
+        done (Optional[Set[str]]): Resume keys to skip (from a checkpoint)
+    """
+    done = done or set()
+    job_matrix = JobMatrix(jobs)
+
+    pending = []
+    for path in resume_paths:
+        key = resume_key(path)
+        if key in done:
+            logger.info(f"⏭️ Skipping {path} (already in checkpoint)")
+            continue
+        pending.append((key, path))
+
+    with ThreadPoolExecutor(max_workers=parse_workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=llm_workers) as llm_pool:
+        parse_futures = {parse_pool.submit(_at_batch_priority, parse_resume_from_path, path): (key, path) for key, path in pending}
+        score_futures = {}
+        # Hand parsed resumes to the LLM pool and emit scored ones as they finish
+        while parse_futures or score_futures:
+            finished, _ = wait(list(parse_futures) + list(score_futures), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in score_futures:
+                    key, path = score_futures.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to score {path}: {e}")
+                        rows = [_error_row(path, str(e))]
+                    yield key, rows
+                    continue
+                key, path = parse_futures.pop(future)
+                try:
+                    resume_data = future.result()
+                except Exception as e:
+                    resume_data = {"error": str(e)}
+                if "error" in resume_data:
+                    logger.error(f"Failed to parse {path}: {resume_data['error']}")
+                    yield key, [_error_row(path, resume_data["error"])]
+                    continue
+                # Serialized once for all of this resume's top_k match prompts
+                resume_data = ResumeProfile.coerce(resume_data)
+                prerank = job_matrix.prerank([resume_data])[0]
+                score_futures[llm_pool.submit(
+                    _at_batch_priority, _score_resume, matcher, os.path.basename(path), resume_data, jobs, prerank, top_k
+                )] = (key, path)
+
+
+def run_batch(source: str, jobs: List[Dict], out_path: str, fmt: str = "jsonl", matcher=None,
+              top_k: int = 5, parse_workers: int = 4, llm_workers: int = 2) -> int:
+    """
+    Screen every resume in ``source`` and stream the rows to ``out_path``.
+    Progress is checkpointed to ``<out_path>.checkpoint``; rerunning with the
+    same arguments skips resumes that were already written. Resumes that
+    failed to parse or score get an error row but no checkpoint entry, so a
+    rerun retries them.
+
+    Returns:
+        int: Number of resumes screened in this run
+    """
+    checkpoint_path = out_path + ".checkpoint"
+    done = _load_checkpoint(checkpoint_path)
+    extract_dir = tempfile.mkdtemp(prefix="cvision-batch-")
+    writer = ResultWriter(out_path, fmt)
+    screened = 0
+    try:
+        paths = collect_resumes(source, extract_dir)
+        already = done & {resume_key(path) for path in paths}
+        logger.info(f"📂 {len(paths)} resumes found, {len(already)} already screened")
+        with open(checkpoint_path, "a") as checkpoint:
+            for key, rows in screen_resumes(paths, jobs, matcher, top_k, parse_workers, llm_workers, done):
+                writer.write(rows)
+                screened += 1
+                if any(row["error"] for row in rows):
+                    logger.info(f"⚠️ Screened {screened}/{len(paths) - len(already)} with errors, "
+                                f"retried on the next run: {key}")
+                    continue
+                checkpoint.write(key + "\n")
+                checkpoint.flush()
+                logger.info(f"✅ Screened {screened}/{len(paths) - len(already)}: {key}")
+    finally:
+        writer.close()
+        shutil.rmtree(extract_dir, ignore_errors=True)
+    return screened
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen many resumes against one set of jobs")
+    parser.add_argument("resumes", help="PDF, directory of PDFs, or .zip/.tar archive")
+    parser.add_argument("--jobs", default="output/job_listings.json",
+                        help="Extracted jobs: a JSON list or .jsonl (see resume_scraper.models)")
+    parser.add_argument("--out", default="output/screening.jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                        help="Defaults to the --out file extension")
+    parser.add_argument("--top-k", type=int, default=5, help="Jobs per resume scored by the LLM (0 = pre-rank only)")
+    parser.add_argument("--parse-workers", type=int, default=4)
+    parser.add_argument("--llm-workers", type=int, default=2)
+    parser.add_argument("--model", default="llama3.2")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    jobs = read_records(args.jobs, JobListing)
+    fmt = args.format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    matcher = None
+    if args.top_k:
+        from fapp import ResumeJobMatcher
+        matcher = ResumeJobMatcher(model_name=args.model)
+    screened = run_batch(args.resumes, jobs, args.out, fmt, matcher, args.top_k,
+                         args.parse_workers, args.llm_workers)
+    logger.info(f"💾 Screened {screened} resumes against {len(jobs)} jobs -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# bench.py
+"""
+Offline benchmark for the scrape -> clean -> split -> extract -> match pipeline.
+
+Replays the checked-in fixtures (scraped_content.html and the PDFs in
+__DATA__) through the real pipeline code with local fakes standing in for
+Ollama, Gemini and the browser, and prints per-stage results as JSON.
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.bench --repeat 5 --out output/bench.json
+"""
+import argparse
+import contextlib
+import glob
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from resume_scraper.fakes import FakeOllamaLLM, FakeGenAI, FakeWebDriver
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_HTML = os.path.join(ROOT_DIR, "scraped_content.html")
+FIXTURE_PDFS = os.path.join(ROOT_DIR, "__DATA__", "*.pdf")
+FIXTURE_URL = "https://www.linkedin.com/jobs/search/?keywords=python&location=kathmandu"
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def patched(obj, attr: str, value):
+    """Temporarily replace ``obj.attr`` with ``value``."""
+    original = getattr(obj, attr)
+    setattr(obj, attr, value)
+    try:
+        yield value
+    finally:
+        setattr(obj, attr, original)
+
+
+def _run_stage(name: str, fn: Callable, repeat: int, fakes: List, size: Callable = len) -> Dict:
+    """
+    Time ``fn`` ``repeat`` times, then run it once more under tracemalloc for
+    the memory peak (kept separate so tracing does not skew the timings).
+    """
+    calls_before = [fake.stats.calls for fake in fakes]
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    calls = sum(fake.stats.calls - before for fake, before in zip(fakes, calls_before)) // repeat
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    items = size(result) if result is not None else 0
+    median = statistics.median(timings)
+    return {
+        "stage": name,
+        "runs": repeat,
+        "wall_time_s": {
+            "median": round(median, 6),
+            "min": round(min(timings), 6),
+            "max": round(max(timings), 6),
+        },
+        "items": items,
+        "throughput_items_per_s": round(items / median, 2) if median else None,
+        "peak_memory_bytes": peak,
+        "llm_calls": calls,
+    }, result
+
+
+def run_benchmark(repeat: int = 3, ollama_latency: float = 0.0, token_latency: float = 0.0,
+                  gemini_latency: float = 0.0, browser_latency: float = 0.0,
+                  max_chunks: int = 0) -> Dict:
+    """
+    Run every stage against the fixtures and return the report dict.
+
+    Args:
+        repeat (int): Timed runs per stage
+        ollama_latency (float): Fake Ollama time to first token, in seconds
+        token_latency (float): Fake Ollama delay between streamed chunks
+        gemini_latency (float): Fake Gemini latency, in seconds
+        browser_latency (float): Fake browser page load time, in seconds
+        max_chunks (int): Only extract jobs from the first N chunks (0 = all)
+    """
+    with open(FIXTURE_HTML, "r", encoding="utf-8") as f:
+        html = f.read()
+    pdfs = sorted(glob.glob(FIXTURE_PDFS))
+
+    workdir = tempfile.mkdtemp(prefix="cvision-bench-")
+    cwd = os.getcwd()
+    # The pipeline writes uploads and outputs relative to the working directory,
+    # so run it somewhere the checked-in fixtures cannot be overwritten.
+    os.chdir(workdir)
+    try:
+        from resume_scraper import scraper, resume_processor, resume_praser
+        import fapp
+
+        ollama = FakeOllamaLLM(latency=ollama_latency, token_latency=token_latency)
+        genai = FakeGenAI(latency=gemini_latency)
+        driver = FakeWebDriver(default_html=html, latency=browser_latency)
+        # No match cache: every repeat should pay for the LLM calls it measures
+        matcher = fapp.ResumeJobMatcher(match_cache=None)
+        matcher.llm = ollama
+
+        stages = []
+        with patched(scraper, "create_webdriver", lambda: driver), patched(resume_praser, "genai", genai), \
+                patched(resume_praser, "_gemini_configured", lambda: True):
+            report, page = _run_stage(
+                "scrape", lambda: scraper.scrape_website(FIXTURE_URL, human_delay=(0, 0)),
+                repeat, [], size=lambda r: 1 if r else 0)
+            report["bytes"] = len(page)
+            stages.append(report)
+
+            report, cleaned = _run_stage("clean_body_content", lambda: scraper.clean_body_content(page), repeat, [], size=lambda r: 1)
+            report["bytes_in"] = len(page)
+            report["bytes_out"] = len(cleaned)
+            report["throughput_mb_per_s"] = round(len(page) / 1e6 / report["wall_time_s"]["median"], 2)
+            stages.append(report)
+
+            report, chunks = _run_stage("split_dom_content", lambda: scraper.split_dom_content(cleaned), repeat, [])
+            stages.append(report)
+
+            report, texts = _run_stage(
+                "extract_text_from_pdf",
+                lambda: [resume_processor.extract_text_from_pdf(path) for path in pdfs],
+                repeat, [])
+            stages.append(report)
+
+            selected = chunks[:max_chunks] if max_chunks else chunks
+            report, jobs = _run_stage(
+                "extract_job_details",
+                lambda: [job for job in map(matcher._extract_job_details, selected) if job],
+                repeat, [ollama])
+            stages.append(report)
+
+            filtered = matcher.filter_jobs(jobs)
+
+            def match():
+                with open(pdfs[0], "rb") as resume_file:
+                    return matcher.match_resume_to_jobs(resume_file, filtered)
+
+            report, matched = _run_stage("match_resume_to_jobs", match, repeat, [ollama, genai])
+            stages.append(report)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "repeat": repeat,
+            "ollama_latency_s": ollama_latency,
+            "token_latency_s": token_latency,
+            "gemini_latency_s": gemini_latency,
+            "browser_latency_s": browser_latency,
+            "max_chunks": max_chunks,
+        },
+        "fixtures": {
+            "html_bytes": len(html),
+            "pdfs": [os.path.basename(path) for path in pdfs],
+        },
+        "stages": stages,
+        "llm": {"ollama": ollama.stats.as_dict(), "gemini": genai.stats.as_dict()},
+        "total_wall_time_s": round(sum(stage["wall_time_s"]["median"] for stage in stages), 6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ollama-latency", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.0)
+    parser.add_argument("--browser-latency", type=float, default=0.0)
+    parser.add_argument("--max-chunks", type=int, default=0)
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    # Keep the pipeline's own INFO logging out of the timings and the output
+    logging.disable(logging.INFO)
+    report = run_benchmark(
+        repeat=args.repeat,
+        ollama_latency=args.ollama_latency,
+        token_latency=args.token_latency,
+        gemini_latency=args.gemini_latency,
+        browser_latency=args.browser_latency,
+        max_chunks=args.max_chunks,
+    )
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# crawler.py
+"""
+Background crawler that keeps the job store warm.
+
+Runs as its own process, separate from the web app. On every cycle it
+refreshes the configured queries plus the most requested ones from the job
+store, respecting a minimum delay between requests to the same host and
+backing off exponentially on queries that keep failing.
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.crawler --queries queries.json --refresh 3600
+where queries.json is a list of {"keyword": ..., "location": ...} objects.
+"""
+import argparse
+import json
+import logging
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from resume_scraper.job_store import JobStore, normalize_query
+from resume_scraper.llm_scheduler import BATCH, llm_priority
+from resume_scraper.scraper import build_search_url
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlScheduler:
+    """
+    Decides which queries are due and crawls them one at a time.
+
+    Args:
+        store (JobStore): Where extracted jobs are written
+        matcher: Object with ``scrape_job_listings(urls)`` (a ResumeJobMatcher)
+        queries (List[Tuple[str, str]]): Always-refreshed (keyword, location) pairs
+        refresh (float): Seconds after which a stored search is refreshed
+        popular (int): How many of the most requested searches to add
+        min_host_delay (float): Minimum seconds between requests to one host
+        max_backoff (float): Cap on the retry delay of a failing query
+    """
+
+    def __init__(self, store: JobStore, matcher, queries: List[Tuple[str, str]], refresh: float = 3600,
+                 popular: int = 10, min_host_delay: float = 30, max_backoff: float = 6 * 3600):
+        self.store = store
+        self.matcher = matcher
+        self.queries = [normalize_query(*q) for q in queries]
+        self.refresh = refresh
+        self.popular = popular
+        self.min_host_delay = min_host_delay
+        self.max_backoff = max_backoff
+        self._last_request: Dict[str, float] = {}
+        self._failures: Dict[Tuple[str, str], int] = {}
+        self._retry_at: Dict[Tuple[str, str], float] = {}
+
+    def due_queries(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        now = now or time.time()
+        candidates = list(dict.fromkeys(self.queries + self.store.popular_queries(self.popular)))
+        due = []
+        for query in candidates:
+            if self._retry_at.get(query, 0) > now:
+                continue
+            fetched_at = self.store.fetched_at(*query)
+            if fetched_at is None or now - fetched_at >= self.refresh:
+                due.append(query)
+        return due
+
+    def _wait_for_host(self, url: str):
+        host = urlparse(url).netloc
+        wait = self._last_request.get(host, 0) + self.min_host_delay - time.time()
+        if wait > 0:
+            # Jitter keeps repeated crawls from hitting the site on a fixed beat
+            time.sleep(wait + random.uniform(0, self.min_host_delay * 0.1))
+        self._last_request[host] = time.time()
+
+    def crawl(self, query: Tuple[str, str]) -> bool:
+        url = build_search_url(*query)
+        self._wait_for_host(url)
+        try:
+            # Pre-warming must not take LLM slots ahead of live uploads
+            with llm_priority(BATCH):
+                jobs = self.matcher.scrape_job_listings([url])
+            if not jobs:
+                raise RuntimeError("no jobs extracted")
+        except Exception as e:
+            failures = self._failures.get(query, 0) + 1
+            self._failures[query] = failures
+            backoff = min(self.max_backoff, self.min_host_delay * 2 ** failures)
+            self._retry_at[query] = time.time() + backoff
+            logger.warning(f"⚠️ Crawl of {query} failed ({e}); retrying in {backoff:.0f}s")
+            return False
+        self._failures.pop(query, None)
+        self._retry_at.pop(query, None)
+        self.store.put_jobs(*query, jobs)
+        logger.info(f"✅ Stored {len(jobs)} jobs for {query}")
+        return True
+
+    def run_once(self) -> int:
+        """Crawl every due query; returns how many succeeded."""
+        return sum(self.crawl(query) for query in self.due_queries())
+
+    def run_forever(self, poll: float = 60):
+        while True:
+            try:
+                crawled = self.run_once()
+                if crawled:
+                    logger.info(f"🔁 Crawl cycle refreshed {crawled} searches")
+            except Exception as e:
+                logger.error(f"Crawl cycle failed: {e}")
+            time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm the job store in the background")
+    parser.add_argument("--queries", help="JSON file with a list of {keyword, location} objects")
+    parser.add_argument("--refresh", type=float, default=3600, help="Seconds before a search is re-crawled")
+    parser.add_argument("--popular", type=int, default=10, help="Also refresh the N most requested searches")
+    parser.add_argument("--min-host-delay", type=float, default=30)
+    parser.add_argument("--poll", type=float, default=60, help="Seconds between scheduling passes")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    queries = []
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [(q.get("keyword", ""), q.get("location", "")) for q in json.load(f)]
+
+    from fapp import ResumeJobMatcher
+    scheduler = CrawlScheduler(JobStore(), ResumeJobMatcher(), queries, refresh=args.refresh,
+                               popular=args.popular, min_host_delay=args.min_host_delay)
+    if args.once:
+        scheduler.run_once()
+    else:
+        scheduler.run_forever(poll=args.poll)
+
+
+if __name__ == "__main__":
+    main()
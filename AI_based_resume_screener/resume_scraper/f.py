@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 
 from resume_scraper.resume_processor import parse_resume_from_file
 from resume_scraper.scraper import scrape_website, clean_body_content, split_dom_content
+from resume_scraper.structured_output import parse_json_response, JOB_DETAILS_SCHEMA, MATCH_DETAILS_SCHEMA
 from langchain_core.prompts import PromptTemplate
 from langchain_ollama import OllamaLLM
 
@@ -18,7 +19,8 @@ logger = logging.getLogger(__name__)
 
 class ResumeJobMatcher:
     def __init__(self, model_name="llama3.2"):
-        self.llm = OllamaLLM(model=model_name)
+        # format="json" puts Ollama in JSON mode so responses are a single object
+        self.llm = OllamaLLM(model=model_name, format="json")
         
     def scrape_job_listings(self, job_sites: List[str]) -> List[Dict]:
         job_listings = []
@@ -61,28 +63,13 @@ Ensure the response is a valid JSON object. If information is not found, use emp
         )
         try:
             response = self.llm.invoke(job_extract_prompt.format(job_content=content))
-            return self._clean_json_response(response)
+            return self._clean_json_response(response, JOB_DETAILS_SCHEMA)
         except Exception as e:
             logger.error(f"Error extracting job details: {e}")
             return None
 
-    def _clean_json_response(self, response: str) -> Dict:
-        import re
-        response = response.replace("```json", "").replace("```", "").strip()
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            try:
-                start = response.index('{')
-                end = response.rindex('}') + 1
-                json_str = response[start:end]
-                json_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', json_str)
-                return json.loads(json_str)
-            except (ValueError, json.JSONDecodeError) as e:
-                logger.error("Could not parse job details JSON")
-                logger.error(f"Error: {e}")
-                logger.error(f"Raw LLM Response: {response}")
-                return {}
+    def _clean_json_response(self, response: str, schema: Optional[Dict] = None) -> Dict:
+        return parse_json_response(response, schema)
 
     def match_resume_to_jobs(self, resume_file, job_listings: List[Dict]) -> List[Dict]:
         resume_data = parse_resume_from_file(resume_file)
@@ -137,7 +124,7 @@ Evaluation Criteria:
                 print("LLM raw output:")
                 print(match_result)
 
-                match_data = self._clean_json_response(match_result)
+                match_data = self._clean_json_response(match_result, MATCH_DETAILS_SCHEMA)
                 matched_job = {**job, "match_details": match_data}
                 matched_jobs.append(matched_job)
             except Exception as e:
@@ -0,0 +1,292 @@
+# fakes.py
+"""
+Deterministic local stand-ins for Ollama, Gemini and the Selenium browser.
+
+They return the same output for the same input, can be given a latency to
+mimic the real services, and count every call so benchmarks can report how
+many LLM requests a stage made.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+
+def _stable_int(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _words(text: str) -> List[str]:
+    return [w.strip(".,:;()[]\"'").lower() for w in text.split() if len(w) > 3]
+
+
+class CallStats:
+    """Thread-safe counters shared by the fakes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+    def record(self, prompt: str, response: str):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+            self.response_chars += len(response)
+
+    def as_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "prompt_chars": self.prompt_chars,
+            "response_chars": self.response_chars,
+        }
+
+
+class _ErrorInjector:
+    """Seeded, thread-safe coin flip deciding which calls fail."""
+
+    def __init__(self, rate: float, seed: int = 0):
+        self.rate = rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def maybe_fail(self, service: str):
+        if not self.rate:
+            return
+        with self._lock:
+            fail = self._random.random() < self.rate
+        if fail:
+            raise ConnectionError(f"injected {service} failure")
+
+
+class FakeOllamaLLM:
+    """
+    Drop-in for ``OllamaLLM`` supporting ``invoke`` and ``stream`` and their
+    async forms ``ainvoke`` and ``astream``.
+
+    Args:
+        latency (float): Seconds to wait before the first token
+        token_latency (float): Seconds to wait between streamed chunks
+        error_rate (float): Fraction of calls that raise ConnectionError
+    """
+
+    def __init__(self, latency: float = 0.0, token_latency: float = 0.0, chunk_size: int = 8,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.chunk_size = chunk_size
+        self.errors = _ErrorInjector(error_rate, seed)
+        self.stats = CallStats()
+
+    def respond(self, prompt: str) -> str:
+        if "Extract structured job details" in prompt:
+            return json.dumps(self._job_details(prompt))
+        if "Explain the result" in prompt:
+            return json.dumps({
+                "match_reasoning": "Deterministic explanation generated by FakeOllamaLLM.",
+                "matched_experience": [],
+                "improvement_suggestions": ["Add measurable outcomes to project descriptions."],
+                "additional_comments": ""
+            })
+        return json.dumps(self._match_details(prompt))
+
+    def _job_details(self, prompt: str) -> Dict:
+        content = prompt.split("Content:", 1)[-1].split("Please provide a JSON response", 1)[0]
+        lines = [line.strip() for line in content.splitlines() if line.strip()]
+        lines += [""] * 3
+        return {
+            "job_title": lines[0],
+            "company": lines[1],
+            "location": lines[2],
+            "description": " ".join(lines[3:8]),
+            "requirements": lines[3:6],
+            "skills_required": sorted(set(_words(" ".join(lines[:20]))))[:5],
+            "experience_level": "",
+            "salary_range": ""
+        }
+
+    def _match_details(self, prompt: str) -> Dict:
+        words = sorted(set(_words(prompt)))
+        return {
+            "match_score": _stable_int(prompt) % 101,
+            "matched_skills": words[:3],
+            "missing_skills": words[3:5],
+            "match_reasoning": "Deterministic reasoning generated by FakeOllamaLLM. " * 4,
+            "matched_experience": [],
+            "improvement_suggestions": [],
+            "additional_comments": ""
+        }
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        time.sleep(self.latency)
+        self.errors.maybe_fail("ollama")
+        response = self.respond(prompt)
+        self.stats.record(prompt, response)
+        return response
+
+    def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        time.sleep(self.latency)
+        self.errors.maybe_fail("ollama")
+        response = self.respond(prompt)
+        sent = 0
+        try:
+            for i in range(0, len(response), self.chunk_size):
+                if self.token_latency:
+                    time.sleep(self.token_latency)
+                chunk = response[i:i + self.chunk_size]
+                sent += len(chunk)
+                yield chunk
+        finally:
+            # Count only what was actually generated before the caller stopped
+            self.stats.record(prompt, response[:sent])
+
+    async def ainvoke(self, prompt: str, **kwargs) -> str:
+        await asyncio.sleep(self.latency)
+        self.errors.maybe_fail("ollama")
+        response = self.respond(prompt)
+        self.stats.record(prompt, response)
+        return response
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        await asyncio.sleep(self.latency)
+        self.errors.maybe_fail("ollama")
+        response = self.respond(prompt)
+        sent = 0
+        try:
+            for i in range(0, len(response), self.chunk_size):
+                if self.token_latency:
+                    await asyncio.sleep(self.token_latency)
+                chunk = response[i:i + self.chunk_size]
+                sent += len(chunk)
+                yield chunk
+        finally:
+            self.stats.record(prompt, response[:sent])
+
+
+class _FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Drop-in for ``genai.GenerativeModel`` returning a resume JSON object."""
+
+    def __init__(self, latency: float = 0.0, stats: Optional[CallStats] = None,
+                 errors: Optional[_ErrorInjector] = None):
+        self.latency = latency
+        self.stats = stats or CallStats()
+        self.errors = errors or _ErrorInjector(0.0)
+
+    def generate_content(self, contents, **kwargs) -> _FakeGeminiResponse:
+        time.sleep(self.latency)
+        self.errors.maybe_fail("gemini")
+        return self._respond(contents)
+
+    async def generate_content_async(self, contents, **kwargs) -> _FakeGeminiResponse:
+        await asyncio.sleep(self.latency)
+        self.errors.maybe_fail("gemini")
+        return self._respond(contents)
+
+    def _respond(self, contents) -> _FakeGeminiResponse:
+        prompt = json.dumps(contents) if not isinstance(contents, str) else contents
+        response = self.respond(prompt)
+        self.stats.record(prompt, response)
+        return _FakeGeminiResponse(response)
+
+    def respond(self, prompt: str) -> str:
+        text = prompt.split("Resume Text:", 1)[-1]
+        lines = [line.strip() for line in text.replace("\\n", "\n").splitlines() if line.strip()]
+        return json.dumps({
+            "Full Name": lines[0] if lines else "",
+            "Email Address": "",
+            "Phone Number": "",
+            "LinkedIn Profile URL": "",
+            "Education": [],
+            "Work Experience": [],
+            "Technical Skills": sorted(set(_words(text)))[:10],
+            "Soft Skills": [],
+            "Certifications": [],
+            "Projects": []
+        })
+
+
+class FakeGenAI:
+    """Stands in for the ``google.generativeai`` module."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.errors = _ErrorInjector(error_rate, seed)
+        self.stats = CallStats()
+
+    def configure(self, **kwargs):
+        pass
+
+    def GenerativeModel(self, model_name: str, **kwargs) -> FakeGeminiModel:
+        return FakeGeminiModel(latency=self.latency, stats=self.stats, errors=self.errors)
+
+
+class _FakeElement:
+    def __init__(self, html: str):
+        self.html = html
+
+    def get_attribute(self, name: str) -> str:
+        return self.html if name == "outerHTML" else ""
+
+    def is_displayed(self) -> bool:
+        return True
+
+
+class FakeWebDriver:
+    """
+    Minimal Selenium ``webdriver.Chrome`` replacement serving fixed HTML.
+
+    Args:
+        pages (Dict[str, str]): URL to HTML; unknown URLs get ``default_html``
+        latency (float): Seconds each ``get`` takes
+        page_size (Optional[int]): If set, ``find_elements`` reveals matching
+            elements this many at a time, one more batch per scroll, to mimic
+            an infinite-scroll result list
+    """
+
+    def __init__(self, pages: Optional[Dict[str, str]] = None, default_html: str = "", latency: float = 0.0,
+                 page_size: Optional[int] = None):
+        self.pages = pages or {}
+        self.default_html = default_html
+        self.latency = latency
+        self.page_size = page_size
+        self.page_source = ""
+        self.gets = 0
+        self.visible = 0
+        self._elements: Dict[str, List[str]] = {}
+
+    def get(self, url: str):
+        time.sleep(self.latency)
+        self.gets += 1
+        self.page_source = self.pages.get(url, self.default_html)
+        self.visible = self.page_size or 0
+        self._elements = {}
+
+    def find_elements(self, by, selector: str) -> List[_FakeElement]:
+        if selector not in self._elements:
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(self.page_source, "html.parser")
+            self._elements[selector] = [str(element) for element in soup.select(selector)]
+        elements = self._elements[selector]
+        if self.page_size:
+            elements = elements[:self.visible]
+        return [_FakeElement(html) for html in elements]
+
+    def execute_script(self, script: str, *args):
+        if "scrollTo" in script and self.page_size:
+            time.sleep(self.latency)
+            self.visible += self.page_size
+        if "scrollHeight" in script:
+            return self.visible * 100
+        return None
+
+    def quit(self):
+        pass
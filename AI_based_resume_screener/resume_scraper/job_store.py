@@ -0,0 +1,109 @@
+# job_store.py
+"""
+Shared local store of extracted jobs per (keyword, location) search.
+
+The background crawler writes to it and /upload reads from it, so both can
+run as separate processes; SQLite in WAL mode handles the locking. Jobs are
+stored in the compact .cvb format (see resume_scraper.models).
+"""
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+from resume_scraper.models import JobListing, dumps_cvb, loads_cvb, loads_jsonl
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_PATH = os.path.join("output", "job_store.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    keyword TEXT NOT NULL,
+    location TEXT NOT NULL,
+    jobs TEXT,
+    fetched_at REAL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    last_requested REAL,
+    PRIMARY KEY (keyword, location)
+)
+"""
+
+
+def normalize_query(keyword: str, location: str) -> Tuple[str, str]:
+    return " ".join((keyword or "").lower().split()), " ".join((location or "").lower().split())
+
+
+class JobStore:
+    def __init__(self, path: str = JOB_STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_jobs(self, keyword: str, location: str, max_age: float) -> Optional[List[JobListing]]:
+        """Jobs stored for the search if they are at most ``max_age`` seconds old."""
+        keyword, location = normalize_query(keyword, location)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT jobs, fetched_at FROM searches WHERE keyword = ? AND location = ?",
+                (keyword, location)
+            ).fetchone()
+        if not row or row[0] is None or time.time() - row[1] > max_age:
+            return None
+        if isinstance(row[0], bytes):
+            return loads_cvb(row[0])
+        if row[0].startswith("["):
+            # Written before jobs were stored as JSONL
+            return [JobListing(job) for job in json.loads(row[0]) if job]
+        # Written before jobs were stored as .cvb
+        return loads_jsonl(row[0], JobListing)
+
+    def put_jobs(self, keyword: str, location: str, jobs: List[Dict]):
+        keyword, location = normalize_query(keyword, location)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO searches (keyword, location, jobs, fetched_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (keyword, location) DO UPDATE SET jobs = excluded.jobs, fetched_at = excluded.fetched_at",
+                (keyword, location, dumps_cvb(jobs), time.time())
+            )
+            conn.commit()
+
+    def record_request(self, keyword: str, location: str):
+        """Count a user search so the crawler can keep popular queries warm."""
+        keyword, location = normalize_query(keyword, location)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO searches (keyword, location, requests, last_requested) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (keyword, location) DO UPDATE SET requests = requests + 1, "
+                "last_requested = excluded.last_requested",
+                (keyword, location, time.time())
+            )
+            conn.commit()
+
+    def popular_queries(self, limit: int = 10, since: float = 7 * 24 * 3600) -> List[Tuple[str, str]]:
+        """Most requested searches in the last ``since`` seconds."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT keyword, location FROM searches WHERE last_requested >= ? "
+                "ORDER BY requests DESC LIMIT ?",
+                (time.time() - since, limit)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def fetched_at(self, keyword: str, location: str) -> Optional[float]:
+        keyword, location = normalize_query(keyword, location)
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM searches WHERE keyword = ? AND location = ?",
+                (keyword, location)
+            ).fetchone()
+        return row[0] if row else None
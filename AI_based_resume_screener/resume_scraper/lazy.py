@@ -0,0 +1,75 @@
+# lazy.py
+"""
+Deferred construction of the heavy LLM clients.
+
+langchain_core, langchain_ollama and google.generativeai take most of a
+second each to import. The app modules build their prompts and clients
+through these helpers so those imports happen on the first LLM call rather
+than when a worker starts (see resume_scraper.startup for the budget check).
+"""
+import os
+import threading
+from typing import Any, Callable, List
+
+_lock = threading.Lock()
+_genai = None
+
+
+class LazyPromptTemplate:
+    """``PromptTemplate`` built on the first ``format`` call."""
+
+    def __init__(self, template: str, input_variables: List[str]):
+        self.template = template
+        self.input_variables = input_variables
+        self._prompt = None
+
+    def _build(self):
+        if self._prompt is None:
+            from langchain_core.prompts import PromptTemplate
+
+            self._prompt = PromptTemplate(template=self.template, input_variables=self.input_variables)
+        return self._prompt
+
+    def format(self, **kwargs: Any) -> str:
+        return self._build().format(**kwargs)
+
+
+def ollama_llm(model: str, **kwargs: Any):
+    """
+    Create an ``OllamaLLM``, importing langchain_ollama on first use. The
+    server is OLLAMA_BASE_URL if set (otherwise the ollama client's own
+    OLLAMA_HOST / localhost default).
+    """
+    from langchain_ollama import OllamaLLM
+
+    if os.getenv("OLLAMA_BASE_URL"):
+        kwargs.setdefault("base_url", os.getenv("OLLAMA_BASE_URL"))
+    return OllamaLLM(model=model, **kwargs)
+
+
+def ollama_factory(model: str, **kwargs: Any) -> Callable:
+    """Zero-argument factory for ``LangChainBackend(client_factory=...)``."""
+    return lambda: ollama_llm(model, **kwargs)
+
+
+def load_genai():
+    """
+    The ``google.generativeai`` module, configured with GEMINI_API_KEY on
+    first use. GEMINI_API_ENDPOINT (e.g. ``http://127.0.0.1:8703``) sends
+    requests over REST to another server, such as the load-test stub.
+    """
+    global _genai
+    with _lock:
+        if _genai is None:
+            import google.generativeai as module
+
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                print("API key is not found. Please set the GEMINI_API_KEY environment variable.")
+            endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if endpoint:
+                module.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+            else:
+                module.configure(api_key=api_key)
+            _genai = module
+        return _genai
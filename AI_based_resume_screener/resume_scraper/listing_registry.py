@@ -0,0 +1,330 @@
+# listing_registry.py
+"""
+Registry of job postings we have already scraped and extracted.
+
+Postings are fingerprinted by normalized title, company and location, and
+every page and text chunk is content-hashed, so repeat searches can skip
+the LLM extraction for anything that has not changed and duplicate postings
+collapse to one record before matching.
+
+The registry lives in SQLite (WAL mode), like the job store, so concurrent
+requests, the aiohttp app and the background crawler all read and write the
+same rows instead of each rewriting a whole file.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Set, Tuple
+
+from resume_scraper.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_PATH = os.path.join("output", "listing_registry.db")
+# Read once into a new database; written by earlier versions
+LEGACY_REGISTRY_PATH = os.path.join("output", "listing_registry.json")
+MAX_AGE_SECONDS = 14 * 24 * 3600
+# Expired rows are deleted at most this often per database and process
+PRUNE_INTERVAL_SECONDS = 3600
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_SEPARATORS = (",", ":")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS listings (
+        fingerprint TEXT PRIMARY KEY,
+        job TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        sources TEXT NOT NULL,
+        first_seen REAL NOT NULL,
+        last_seen REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chunks (
+        chunk_hash TEXT PRIMARY KEY,
+        fingerprints TEXT NOT NULL,
+        last_seen REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        page_hash TEXT NOT NULL,
+        fingerprints TEXT NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        last_seen REAL NOT NULL
+    )
+    """,
+)
+
+# Per database, shared by every registry in the process: schema created, last prune time
+_initialized: Set[str] = set()
+_last_pruned: Dict[str, float] = {}
+_state_lock = threading.Lock()
+
+
+def normalize(text) -> str:
+    text = _NON_WORD.sub(" ", str(text or "").lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(normalize(text).encode("utf-8")).hexdigest()
+
+
+def job_fingerprint(job: Dict) -> str:
+    """Identity of a posting: normalized title, company and location."""
+    # models.JobListing computes it once and caches it
+    cached = getattr(job, "fingerprint", None)
+    return cached if cached is not None else fingerprint_of(job)
+
+
+def fingerprint_of(job: Dict) -> str:
+    key = "|".join(normalize(job.get(field)) for field in ("job_title", "company", "location"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def job_content_hash(job: Dict) -> str:
+    return hashlib.sha1(json.dumps(dict(job), sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _dumps(value) -> str:
+    # dict() so records from models.py serialize like plain dicts
+    return json.dumps(dict(value) if not isinstance(value, (dict, list)) else value,
+                      ensure_ascii=False, separators=_SEPARATORS)
+
+
+def _merge_jobs(existing: Dict, other: Dict) -> Dict:
+    """Fill empty fields of ``existing`` from ``other`` and union list fields."""
+    merged = dict(existing)
+    for key, value in other.items():
+        current = merged.get(key)
+        if isinstance(current, list) and isinstance(value, list):
+            merged[key] = current + [item for item in value if item not in current]
+        elif not current and value:
+            merged[key] = value
+    return merged
+
+
+def dedupe_jobs(jobs: List[Dict]) -> List[Dict]:
+    """Collapse postings with the same fingerprint into a single record, keeping order."""
+    unique: Dict[str, Dict] = {}
+    for job in jobs:
+        if not job:
+            continue
+        fingerprint = job_fingerprint(job)
+        unique[fingerprint] = _merge_jobs(unique[fingerprint], job) if fingerprint in unique else job
+    if len(unique) < len(jobs):
+        logger.info(f"🧹 Collapsed {len(jobs)} postings to {len(unique)} unique listings")
+    return list(unique.values())
+
+
+class ListingRegistry:
+    """
+    SQLite-backed store of pages, chunks and listings seen by the scraper.
+
+    Instances are cheap (a connection per call), so each request can create
+    its own; they all share the database at ``path``.
+
+    Args:
+        path (str): SQLite database file
+        max_age (float): Entries not seen for this many seconds are dropped by prune()
+    """
+
+    def __init__(self, path: str = REGISTRY_PATH, max_age: float = MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age = max_age
+        with _state_lock:
+            if path in _initialized:
+                return
+            self._create(path)
+            _initialized.add(path)
+
+    def _create(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            if path == REGISTRY_PATH and os.path.exists(LEGACY_REGISTRY_PATH):
+                self._import_legacy(conn, LEGACY_REGISTRY_PATH)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _import_legacy(self, conn: sqlite3.Connection, legacy_path: str):
+        """Copy a JSON registry into an empty database, then rename the file so it is read only once."""
+        if conn.execute("SELECT 1 FROM listings LIMIT 1").fetchone() is not None:
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable listing registry {legacy_path}: {e}")
+            return
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO listings VALUES (?, ?, ?, ?, ?, ?)",
+                [(fingerprint, _dumps(entry["job"]), entry.get("content_hash", ""),
+                  _dumps(entry.get("sources", [])), entry.get("first_seen", now), entry.get("last_seen", now))
+                 for fingerprint, entry in data.get("listings", {}).items() if entry.get("job")]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO chunks VALUES (?, ?, ?)",
+                [(digest, _dumps(entry.get("fingerprints", [])), entry.get("last_seen", now))
+                 for digest, entry in data.get("chunks", {}).items()]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, entry.get("page_hash", ""), _dumps(entry.get("fingerprints", [])), entry.get("etag"),
+                  entry.get("last_modified"), entry.get("last_seen", now))
+                 for url, entry in data.get("pages", {}).items()]
+            )
+        try:
+            os.replace(legacy_path, f"{legacy_path}.imported")
+        except OSError:
+            pass
+        logger.info(f"📥 Imported listing registry {legacy_path} into {self.path}")
+
+    def prune(self, force: bool = False):
+        """Delete entries not seen for ``max_age`` seconds (at most once per PRUNE_INTERVAL_SECONDS)."""
+        now = time.time()
+        with _state_lock:
+            if not force and now - _last_pruned.get(self.path, 0) < PRUNE_INTERVAL_SECONDS:
+                return
+            _last_pruned[self.path] = now
+        cutoff = now - self.max_age
+        with closing(self._connect()) as conn, conn:
+            for table in ("listings", "chunks", "pages"):
+                conn.execute(f"DELETE FROM {table} WHERE last_seen < ?", (cutoff,))
+
+    # Listings
+
+    def add_listing(self, job: Dict, source: str = "") -> Tuple[str, str]:
+        """
+        Record a posting.
+
+        Returns:
+            Tuple[str, str]: The fingerprint and "new", "changed" or "unchanged"
+        """
+        with closing(self._connect()) as conn:
+            return self._add_listing(conn, job, source)
+
+    def _add_listing(self, conn: sqlite3.Connection, job: Dict, source: str) -> Tuple[str, str]:
+        fingerprint = job_fingerprint(job)
+        digest = job_content_hash(job)
+        now = time.time()
+        # IMMEDIATE takes the write lock up front, so the merge below cannot race another writer
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT job, content_hash, sources FROM listings WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row is None:
+                status, sources, first_seen = "new", [], now
+            else:
+                status = "unchanged" if row[1] == digest else "changed"
+                sources = json.loads(row[2])
+                if status == "changed":
+                    job = _merge_jobs(job, json.loads(row[0]))
+            if source and source not in sources:
+                sources.append(source)
+            if row is None:
+                conn.execute("INSERT INTO listings VALUES (?, ?, ?, ?, ?, ?)",
+                             (fingerprint, _dumps(job), digest, _dumps(sources), first_seen, now))
+            else:
+                conn.execute(
+                    "UPDATE listings SET job = ?, content_hash = ?, sources = ?, last_seen = ? WHERE fingerprint = ?",
+                    (_dumps(job), digest, _dumps(sources), now, fingerprint)
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return fingerprint, status
+
+    def get_listings(self, fingerprints: List[str]) -> List[Dict]:
+        with closing(self._connect()) as conn:
+            return self._get_listings(conn, fingerprints)
+
+    @staticmethod
+    def _get_listings(conn: sqlite3.Connection, fingerprints: List[str]) -> List[Dict]:
+        if not fingerprints:
+            return []
+        placeholders = ",".join("?" * len(fingerprints))
+        found = dict(conn.execute(
+            f"SELECT fingerprint, job FROM listings WHERE fingerprint IN ({placeholders})", fingerprints
+        ).fetchall())
+        return [json.loads(found[f]) for f in fingerprints if f in found]
+
+    # Chunks
+
+    def lookup_chunk(self, text: str) -> Optional[List[Dict]]:
+        """Jobs previously extracted from an identical chunk, or None."""
+        digest = content_hash(text)
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT fingerprints FROM chunks WHERE chunk_hash = ?", (digest,)).fetchone()
+            record_cache("chunk", row is not None)
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE chunks SET last_seen = ? WHERE chunk_hash = ?", (time.time(), digest))
+            return self._get_listings(conn, json.loads(row[0]))
+
+    def record_chunk(self, text: str, jobs: List[Dict], source: str = "") -> List[str]:
+        with closing(self._connect()) as conn:
+            fingerprints = [self._add_listing(conn, job, source)[0] for job in jobs if job]
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)",
+                             (content_hash(text), _dumps(fingerprints), time.time()))
+        return fingerprints
+
+    # Pages
+
+    def has_page(self, url: str) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def page_validators(self, url: str) -> Dict[str, str]:
+        """ETag / Last-Modified headers saved for ``url``."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return {}
+        return {key: value for key, value in zip(("etag", "last_modified"), row) if value}
+
+    def lookup_page(self, url: str, text: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        Jobs recorded for ``url``; when ``text`` is given they are only returned
+        if the page content is unchanged.
+        """
+        page_hash = content_hash(text) if text is not None else None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT page_hash, fingerprints FROM pages WHERE url = ?", (url,)).fetchone()
+            hit = row is not None and (page_hash is None or row[0] == page_hash)
+            record_cache("page", hit)
+            if not hit:
+                return None
+            with conn:
+                conn.execute("UPDATE pages SET last_seen = ? WHERE url = ?", (time.time(), url))
+            return self._get_listings(conn, json.loads(row[1]))
+
+    def record_page(self, url: str, text: str, fingerprints: List[str], validators: Optional[Dict] = None):
+        validators = validators or {}
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash(text), _dumps(list(dict.fromkeys(fingerprints))),
+                 validators.get("etag"), validators.get("last_modified"), time.time())
+            )
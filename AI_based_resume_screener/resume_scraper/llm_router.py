@@ -0,0 +1,458 @@
+# llm_router.py
+"""
+Per-task routing of LLM calls across backends.
+
+Each task (``resume_parse``, ``job_extraction``, ``match_scoring``,
+``match_explanation``) has an ordered list of backends plus optional latency
+and cost targets. The router skips backends that are not configured or cost
+too much, demotes backends whose observed p95 latency misses the task's
+target, fails over to the next backend on errors, and can hedge: when the
+first backend has not answered within ``hedge_after`` seconds (or its own
+observed p95), the same prompt is sent to the next backend and the first
+answer wins.
+
+Routes default to DEFAULT_ROUTES and can be overridden with the LLM_ROUTES
+environment variable, either inline JSON or the path of a JSON file:
+
+    {"resume_parse": {"backends": ["gemini", "ollama"], "latency_target": 15, "hedge": true}}
+
+Backends are thin adapters, so the fakes in resume_scraper.fakes can stand in
+for real services.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from resume_scraper.llm_scheduler import SCHEDULER
+from resume_scraper.metrics import REGISTRY, record_llm_call
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTES = {
+    "resume_parse": {"backends": ["gemini", "ollama"], "latency_target": 20, "hedge": True},
+    "job_extraction": {"backends": ["ollama"]},
+    "match_scoring": {"backends": ["ollama"]},
+    "match_explanation": {"backends": ["ollama"]},
+}
+
+# Hedged sync calls run here; a losing call cannot be interrupted and finishes in the background
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+
+
+class NoBackendAvailable(RuntimeError):
+    """Raised when no configured backend can serve a task."""
+
+
+class LatencyTracker:
+    """Rolling window of call latencies per (backend, task)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def record(self, backend: str, task: str, seconds: float):
+        with self._lock:
+            samples = self._samples.setdefault((backend, task), deque(maxlen=self.window))
+            samples.append(seconds)
+            ordered = sorted(samples)
+        REGISTRY.set_gauge("cvision_llm_latency_p50_seconds", _percentile(ordered, 0.5), backend=backend, task=task)
+        REGISTRY.set_gauge("cvision_llm_latency_p95_seconds", _percentile(ordered, 0.95), backend=backend, task=task)
+
+    def percentile(self, backend: str, task: str, q: float, min_samples: int = 5) -> Optional[float]:
+        """Observed latency percentile, or None until ``min_samples`` calls were seen."""
+        with self._lock:
+            samples = self._samples.get((backend, task))
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        return _percentile(ordered, q)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+LATENCY = LatencyTracker()
+
+
+class Backend:
+    """
+    Adapter over one LLM client.
+
+    Args:
+        name (str): Backend name used in routes, metrics and the scheduler
+        cost (float): Relative cost per call, compared with a route's ``max_cost``
+        available (Optional[Callable[[], bool]]): Whether the backend is configured
+    """
+
+    def __init__(self, name: str, cost: float = 0.0, available: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self.cost = cost
+        self._available = available
+
+    def is_available(self) -> bool:
+        return self._available() if self._available else True
+
+    def invoke(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def ainvoke(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.invoke, prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        yield self.invoke(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        yield await self.ainvoke(prompt)
+
+
+class LangChainBackend(Backend):
+    """
+    Backend for LangChain-style clients (``OllamaLLM`` or FakeOllamaLLM).
+
+    Pass ``client_factory`` instead of ``client`` to create the client on the
+    first call, which keeps langchain out of module import time.
+    """
+
+    def __init__(self, name: str, client=None, cost: float = 0.0, available: Optional[Callable[[], bool]] = None,
+                 client_factory: Optional[Callable] = None):
+        super().__init__(name, cost, available)
+        self._client = client
+        self._client_factory = client_factory
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._client_factory()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    def invoke(self, prompt: str) -> str:
+        return self.client.invoke(prompt)
+
+    async def ainvoke(self, prompt: str) -> str:
+        return await self.client.ainvoke(prompt)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        return self.client.stream(prompt)
+
+    def astream(self, prompt: str) -> AsyncIterator[str]:
+        return self.client.astream(prompt)
+
+
+class GeminiBackend(Backend):
+    """
+    Backend for ``genai.GenerativeModel``; ``model_factory`` builds the model per call.
+
+    ``native_async=False`` runs async calls in a thread instead of using
+    ``generate_content_async``, which genai only implements for gRPC.
+    """
+
+    def __init__(self, name: str, model_factory: Callable, cost: float = 1.0,
+                 available: Optional[Callable[[], bool]] = None, native_async: bool = True):
+        super().__init__(name, cost, available)
+        self.model_factory = model_factory
+        self.native_async = native_async
+
+    @staticmethod
+    def _contents(prompt: str) -> List[Dict]:
+        return [{"role": "user", "parts": [prompt]}]
+
+    def invoke(self, prompt: str) -> str:
+        return self.model_factory().generate_content(self._contents(prompt)).text
+
+    async def ainvoke(self, prompt: str) -> str:
+        if not self.native_async:
+            return await super().ainvoke(prompt)
+        response = await self.model_factory().generate_content_async(self._contents(prompt))
+        return response.text
+
+
+class TaskRoute:
+    """
+    Routing policy for one task.
+
+    Args:
+        backends (List[str]): Backends in order of preference
+        latency_target (Optional[float]): Backends whose observed p95 exceeds
+            this many seconds are tried after the ones that meet it
+        max_cost (Optional[float]): Backends costing more are only used as a
+            last resort
+        hedge (bool): Start a second backend if the first one is slow
+        hedge_after (Optional[float]): Seconds before hedging; defaults to the
+            first backend's observed p95
+    """
+
+    def __init__(self, backends: List[str], latency_target: Optional[float] = None,
+                 max_cost: Optional[float] = None, hedge: bool = False, hedge_after: Optional[float] = None):
+        self.backends = list(backends)
+        self.latency_target = latency_target
+        self.max_cost = max_cost
+        self.hedge = hedge or hedge_after is not None
+        self.hedge_after = hedge_after
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaskRoute":
+        return cls(
+            data.get("backends", []),
+            latency_target=data.get("latency_target"),
+            max_cost=data.get("max_cost"),
+            hedge=data.get("hedge", False),
+            hedge_after=data.get("hedge_after"),
+        )
+
+
+def load_routes(config: Optional[str] = None) -> Dict[str, TaskRoute]:
+    """DEFAULT_ROUTES overlaid with ``config`` (JSON or a JSON file path; defaults to $LLM_ROUTES)."""
+    routes = {task: dict(route) for task, route in DEFAULT_ROUTES.items()}
+    config = config if config is not None else os.getenv("LLM_ROUTES", "")
+    if config:
+        if os.path.exists(config):
+            with open(config) as f:
+                config = f.read()
+        for task, route in json.loads(config).items():
+            routes[task] = {**routes.get(task, {}), **route}
+    return {task: TaskRoute.from_dict(route) for task, route in routes.items()}
+
+
+class LLMRouter:
+    """
+    Send task prompts to the best available backend.
+
+    Args:
+        backends (Dict[str, Backend]): Backends by name
+        routes (Optional[Dict[str, TaskRoute]]): Per-task policy; tasks without
+            a route try every backend in insertion order
+    """
+
+    def __init__(self, backends: Dict[str, Backend], routes: Optional[Dict[str, TaskRoute]] = None):
+        self.backends = dict(backends)
+        self.routes = routes if routes is not None else load_routes()
+
+    def route(self, task: str) -> TaskRoute:
+        return self.routes.get(task) or TaskRoute(list(self.backends))
+
+    def choose(self, task: str) -> List[Backend]:
+        """Backends to try for ``task``, best first."""
+        route = self.route(task)
+        candidates = [self.backends[name] for name in route.backends
+                      if name in self.backends and self.backends[name].is_available()]
+
+        def rank(backend: Backend):
+            too_expensive = route.max_cost is not None and backend.cost > route.max_cost
+            p95 = LATENCY.percentile(backend.name, task, 0.95)
+            too_slow = route.latency_target is not None and p95 is not None and p95 > route.latency_target
+            return too_expensive, too_slow
+
+        # sorted() is stable, so configured preference breaks ties
+        return sorted(candidates, key=rank)
+
+    def _hedge_delay(self, task: str, backend: Backend) -> Optional[float]:
+        route = self.route(task)
+        if not route.hedge:
+            return None
+        if route.hedge_after is not None:
+            return route.hedge_after
+        return LATENCY.percentile(backend.name, task, 0.95)
+
+    def _order(self, task: str) -> List[Backend]:
+        order = self.choose(task)
+        if not order:
+            raise NoBackendAvailable(f"No LLM backend available for {task}")
+        return order
+
+    def _failed_over(self, backend: Backend, task: str, error: Exception):
+        REGISTRY.inc("cvision_llm_failovers_total", backend=backend.name, task=task)
+        logger.warning(f"⚠️ {backend.name} failed for {task} ({error}); trying the next backend")
+
+    # Blocking API
+
+    def _call(self, backend: Backend, task: str, prompt: str) -> str:
+        with SCHEDULER.slot(backend.name):
+            start = time.perf_counter()
+            try:
+                response = backend.invoke(prompt)
+            except Exception:
+                record_llm_call(backend.name, task, prompt, None, time.perf_counter() - start, failed=True)
+                raise
+        duration = time.perf_counter() - start
+        record_llm_call(backend.name, task, prompt, response, duration)
+        LATENCY.record(backend.name, task, duration)
+        return response
+
+    def invoke(self, task: str, prompt: str) -> str:
+        order = self._order(task)
+        delay = self._hedge_delay(task, order[0])
+        if delay is not None and len(order) > 1:
+            return self._hedged(task, prompt, order, delay)
+        for i, backend in enumerate(order):
+            try:
+                return self._call(backend, task, prompt)
+            except Exception as e:
+                if i == len(order) - 1:
+                    raise
+                self._failed_over(backend, task, e)
+
+    def _hedged(self, task: str, prompt: str, order: List[Backend], delay: float) -> str:
+        remaining = list(order)
+
+        def start(backend: Backend):
+            return _HEDGE_POOL.submit(contextvars.copy_context().run, self._call, backend, task, prompt)
+
+        running = {start(remaining.pop(0)): order[0]}
+        done, _ = wait(running, timeout=delay)
+        if not done and remaining:
+            backend = remaining.pop(0)
+            REGISTRY.inc("cvision_llm_hedges_total", backend=backend.name, task=task)
+            running[start(backend)] = backend
+        error = None
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                backend = running.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+                    if remaining or running:
+                        self._failed_over(backend, task, e)
+                    if remaining:
+                        running[start(remaining[0])] = remaining.pop(0)
+        raise error
+
+    def stream(self, task: str, prompt: str) -> Iterator[str]:
+        """
+        Stream from the first backend that works. Fails over only before the
+        first chunk; once output has been yielded, errors are raised.
+        """
+        order = self._order(task)
+        for i, backend in enumerate(order):
+            received = []
+            with SCHEDULER.slot(backend.name):
+                start = time.perf_counter()
+                stream = backend.stream(prompt)
+                failed = False
+                try:
+                    for chunk in stream:
+                        received.append(chunk)
+                        yield chunk
+                    return
+                except Exception as e:
+                    failed = True
+                    if received or i == len(order) - 1:
+                        raise
+                    self._failed_over(backend, task, e)
+                finally:
+                    # Closing the generator drops the connection so the backend stops generating
+                    close = getattr(stream, "close", None)
+                    if close:
+                        close()
+                    duration = time.perf_counter() - start
+                    record_llm_call(backend.name, task, prompt, "".join(received), duration, failed=failed)
+                    if not failed:
+                        LATENCY.record(backend.name, task, duration)
+
+    # Async API
+
+    async def _acall(self, backend: Backend, task: str, prompt: str) -> str:
+        async with SCHEDULER.aslot(backend.name):
+            start = time.perf_counter()
+            try:
+                response = await backend.ainvoke(prompt)
+            except Exception:
+                record_llm_call(backend.name, task, prompt, None, time.perf_counter() - start, failed=True)
+                raise
+        duration = time.perf_counter() - start
+        record_llm_call(backend.name, task, prompt, response, duration)
+        LATENCY.record(backend.name, task, duration)
+        return response
+
+    async def ainvoke(self, task: str, prompt: str) -> str:
+        order = self._order(task)
+        delay = self._hedge_delay(task, order[0])
+        if delay is not None and len(order) > 1:
+            return await self._ahedged(task, prompt, order, delay)
+        for i, backend in enumerate(order):
+            try:
+                return await self._acall(backend, task, prompt)
+            except Exception as e:
+                if i == len(order) - 1:
+                    raise
+                self._failed_over(backend, task, e)
+
+    async def _ahedged(self, task: str, prompt: str, order: List[Backend], delay: float) -> str:
+        remaining = list(order)
+
+        def start(backend: Backend) -> asyncio.Task:
+            return asyncio.ensure_future(self._acall(backend, task, prompt))
+
+        running = {start(remaining.pop(0)): order[0]}
+        try:
+            done, _ = await asyncio.wait(running, timeout=delay)
+            if not done and remaining:
+                backend = remaining.pop(0)
+                REGISTRY.inc("cvision_llm_hedges_total", backend=backend.name, task=task)
+                running[start(backend)] = backend
+            error = None
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task_done in done:
+                    backend = running.pop(task_done)
+                    try:
+                        return task_done.result()
+                    except Exception as e:
+                        error = e
+                        if remaining or running:
+                            self._failed_over(backend, task, e)
+                        if remaining:
+                            running[start(remaining[0])] = remaining.pop(0)
+            raise error
+        finally:
+            # Unlike threads, the losing request can be cancelled
+            for pending in running:
+                pending.cancel()
+
+    async def astream(self, task: str, prompt: str) -> AsyncIterator[str]:
+        order = self._order(task)
+        for i, backend in enumerate(order):
+            received = []
+            async with SCHEDULER.aslot(backend.name):
+                start = time.perf_counter()
+                stream = backend.astream(prompt)
+                failed = False
+                try:
+                    async for chunk in stream:
+                        received.append(chunk)
+                        yield chunk
+                    return
+                except Exception as e:
+                    failed = True
+                    if received or i == len(order) - 1:
+                        raise
+                    self._failed_over(backend, task, e)
+                finally:
+                    aclose = getattr(stream, "aclose", None)
+                    if aclose:
+                        await aclose()
+                    duration = time.perf_counter() - start
+                    record_llm_call(backend.name, task, prompt, "".join(received), duration, failed=failed)
+                    if not failed:
+                        LATENCY.record(backend.name, task, duration)
@@ -0,0 +1,284 @@
+# llm_scheduler.py
+"""
+Process-wide admission control for LLM calls.
+
+Every Ollama / Gemini call takes a slot from its backend's limiter first, so
+concurrent uploads, batch screening and the crawler share a fixed number of
+in-flight calls per backend instead of each firing its own burst. Waiting
+calls are served by priority (interactive before batch) and then in arrival
+order. A call whose expected wait exceeds its priority's latency budget is
+rejected up front with :class:`Overloaded` rather than queued behind work it
+cannot finish in time.
+
+Works from threads (``slot``) and from asyncio code (``aslot``).
+"""
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from resume_scraper.metrics import REGISTRY
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Calls made while handling a user request are interactive unless marked otherwise
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class Overloaded(RuntimeError):
+    """Raised when an LLM call cannot start within its latency budget."""
+
+    def __init__(self, backend: str, expected_wait: float, budget: float):
+        self.backend = backend
+        self.expected_wait = expected_wait
+        self.budget = budget
+        super().__init__(
+            f"{backend} is overloaded: expected queue wait {expected_wait:.1f}s exceeds the {budget:.0f}s budget"
+        )
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a client should wait before retrying (for a Retry-After header)."""
+        return max(1, math.ceil(self.expected_wait - self.budget))
+
+
+@contextlib.contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Run LLM calls made inside the block at ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "loop", "event", "future", "granted")
+
+    def __init__(self, priority: int, seq: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.priority = priority
+        self.seq = seq
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class BackendLimiter:
+    """
+    Concurrency cap and priority queue for one backend.
+
+    Args:
+        backend (str): Name used in metrics and errors
+        max_concurrent (int): Calls allowed in flight at once
+        budgets (Dict[int, Optional[float]]): Longest acceptable queue wait per
+            priority in seconds; None never sheds
+    """
+
+    def __init__(self, backend: str, max_concurrent: int, budgets: Dict[int, Optional[float]]):
+        self.backend = backend
+        self.max_concurrent = max(1, max_concurrent)
+        self.budgets = budgets
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._in_flight = 0
+        self._seq = itertools.count()
+        # Moving average of how long a call holds its slot, used to predict waits
+        self._service_time: Optional[float] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def expected_wait(self, priority: int) -> float:
+        """Predicted queue wait for a new call at ``priority`` (0 if unknown)."""
+        with self._lock:
+            return self._expected_wait(priority)
+
+    def _expected_wait(self, priority: int) -> float:
+        if self._service_time is None:
+            return 0.0
+        ahead = sum(1 for waiter in self._queue if waiter.priority <= priority)
+        if self._in_flight < self.max_concurrent and not ahead:
+            return 0.0
+        return math.ceil((ahead + 1) / self.max_concurrent) * self._service_time
+
+    def _update_gauges(self):
+        REGISTRY.set_gauge("cvision_llm_queue_depth", len(self._queue), backend=self.backend)
+        REGISTRY.set_gauge("cvision_llm_in_flight", self._in_flight, backend=self.backend)
+
+    def _shed(self, priority: int, expected: float):
+        budget = self.budgets.get(priority)
+        REGISTRY.inc("cvision_llm_shed_total", backend=self.backend, priority=PRIORITY_NAMES.get(priority, priority))
+        raise Overloaded(self.backend, expected, budget)
+
+    def _enqueue(self, priority: int, loop=None) -> Optional[_Waiter]:
+        """Take a free slot (returns None) or join the queue (returns the waiter)."""
+        with self._lock:
+            if self._in_flight < self.max_concurrent and not self._queue:
+                self._in_flight += 1
+                self._update_gauges()
+                return None
+            budget = self.budgets.get(priority)
+            expected = self._expected_wait(priority)
+            if budget is not None and expected > budget:
+                self._shed(priority, expected)
+            waiter = _Waiter(priority, next(self._seq), loop)
+            heapq.heappush(self._queue, waiter)
+            self._update_gauges()
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout; returns True if the slot was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            self._update_gauges()
+            return False
+
+    def _release(self, held: Optional[float]):
+        with self._lock:
+            if held is None:
+                pass
+            elif self._service_time is None:
+                self._service_time = held
+            else:
+                self._service_time = 0.8 * self._service_time + 0.2 * held
+            if self._queue:
+                # Hand the slot straight to the next waiter; in-flight count is unchanged
+                waiter = heapq.heappop(self._queue)
+                waiter.granted = True
+                waiter.wake()
+            else:
+                self._in_flight -= 1
+            self._update_gauges()
+
+    def _record_wait(self, priority: int, waited: float):
+        REGISTRY.observe("cvision_llm_queue_wait_seconds", waited, backend=self.backend,
+                         priority=PRIORITY_NAMES.get(priority, priority))
+
+    @contextlib.contextmanager
+    def slot(self, priority: Optional[int] = None) -> Iterator[None]:
+        """Hold one of the backend's slots for the duration of the block."""
+        priority = current_priority() if priority is None else priority
+        start = time.perf_counter()
+        waiter = self._enqueue(priority)
+        if waiter is not None:
+            budget = self.budgets.get(priority)
+            if not waiter.event.wait(budget) and not self._abandon(waiter):
+                self._shed(priority, time.perf_counter() - start)
+        self._record_wait(priority, time.perf_counter() - start)
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - held_from)
+
+    @contextlib.asynccontextmanager
+    async def aslot(self, priority: Optional[int] = None) -> AsyncIterator[None]:
+        """Async form of :meth:`slot`; waiting does not block the event loop."""
+        priority = current_priority() if priority is None else priority
+        start = time.perf_counter()
+        waiter = self._enqueue(priority, asyncio.get_running_loop())
+        if waiter is not None:
+            budget = self.budgets.get(priority)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), budget)
+            except asyncio.TimeoutError:
+                if not self._abandon(waiter):
+                    self._shed(priority, time.perf_counter() - start)
+            except asyncio.CancelledError:
+                # Give back a slot that was handed over just as the caller went away
+                if self._abandon(waiter):
+                    self._release(None)
+                raise
+        self._record_wait(priority, time.perf_counter() - start)
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(time.perf_counter() - held_from)
+
+
+class LLMScheduler:
+    """
+    Limiters for all backends, created on first use.
+
+    Args:
+        limits (Dict[str, int]): Max concurrent calls per backend
+        default_limit (int): Limit for backends not in ``limits``
+        budgets (Dict[int, Optional[float]]): Queue-wait budget per priority
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 4,
+                 budgets: Optional[Dict[int, Optional[float]]] = None):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.budgets = dict(budgets or {INTERACTIVE: 30.0, BATCH: None})
+        self._limiters: Dict[str, BackendLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, backend: str) -> BackendLimiter:
+        with self._lock:
+            if backend not in self._limiters:
+                self._limiters[backend] = BackendLimiter(
+                    backend, self.limits.get(backend, self.default_limit), self.budgets
+                )
+            return self._limiters[backend]
+
+    def slot(self, backend: str, priority: Optional[int] = None):
+        return self.limiter(backend).slot(priority)
+
+    def aslot(self, backend: str, priority: Optional[int] = None):
+        return self.limiter(backend).aslot(priority)
+
+
+def _env_float(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return None if value.lower() == "none" else float(value)
+
+
+# One local Ollama serves few generations at once; Gemini is a remote API
+SCHEDULER = LLMScheduler(
+    limits={
+        "ollama": int(os.getenv("OLLAMA_MAX_CONCURRENCY", 2)),
+        "gemini": int(os.getenv("GEMINI_MAX_CONCURRENCY", 8)),
+    },
+    budgets={
+        INTERACTIVE: _env_float("LLM_QUEUE_BUDGET", 30.0),
+        BATCH: _env_float("LLM_BATCH_QUEUE_BUDGET", None),
+    },
+)
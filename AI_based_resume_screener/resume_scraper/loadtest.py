@@ -0,0 +1,265 @@
+# loadtest.py
+"""
+Ramp concurrent /upload traffic against fapp or aapp and report where it breaks.
+
+Each stage keeps ``concurrency`` clients posting the fixture resume back to
+back for ``stage_seconds``, then reports throughput, p50/p95/p99 latency and
+the error rate. The ramp stops early once a stage exceeds --max-error-rate
+or --max-p95; that stage is reported as the scaling limit.
+
+With --start-app the job board, Ollama and Gemini stubs (stub_servers.py)
+and the app are started locally, so nothing external is touched. The app
+runs in a scratch directory, so its job store and result files start empty
+and the repo's output/ is left alone; --job-store-max-age 0 makes every
+upload crawl instead of reusing the first crawl.
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.loadtest --start-app flask --stages 1,2,4,8 --stage-seconds 30
+    python -m resume_scraper.loadtest --start-app aapp --ollama-latency 2 --gemini-latency 3 --error-rate 0.02
+    python -m resume_scraper.loadtest --start-app flask --job-store-max-age 0 --max-p95 30
+    python -m resume_scraper.loadtest --target http://127.0.0.1:5000 --stages 4,16
+"""
+import argparse
+import glob
+import http.client
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from resume_scraper.stub_servers import add_stub_arguments, stubs_from_args
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_PDFS = os.path.join(ROOT_DIR, "__DATA__", "*.pdf")
+
+logger = logging.getLogger(__name__)
+
+
+def _multipart(fields: Dict[str, str], file_field: str, filename: str, data: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'.encode() + data + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def upload_once(target: str, pdf: bytes, keyword: str, location: str, timeout: float) -> str:
+    """
+    POST one resume to /upload (without following the redirect).
+
+    Returns:
+        str: "ok" (redirect to results), "shed" (503), "rejected" (redirect
+        back to the form, i.e. the app reported an error), "http_<status>" or
+        "error" (connection failure / timeout)
+    """
+    url = urlparse(target)
+    body, content_type = _multipart({"job-preference": keyword, "location": location}, "resume", "resume.pdf", pdf)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    try:
+        conn.request("POST", "/upload", body=body, headers={"Content-Type": content_type})
+        response = conn.getresponse()
+        response.read()
+        if response.status in (302, 303):
+            return "ok" if "/results" in (response.getheader("Location") or "") else "rejected"
+        if response.status == 503:
+            return "shed"
+        return f"http_{response.status}"
+    except (OSError, http.client.HTTPException):
+        return "error"
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    rank = max(1, min(len(sorted_values), round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def run_stage(target: str, concurrency: int, stage_seconds: float, pdf: bytes, keyword: str, location: str,
+              timeout: float = 300) -> Dict:
+    """Keep ``concurrency`` clients uploading for ``stage_seconds`` and summarize the results."""
+    deadline = time.monotonic() + stage_seconds
+    results: List[Tuple[str, float]] = []
+    lock = threading.Lock()
+
+    def client():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            outcome = upload_once(target, pdf, keyword, location, timeout)
+            with lock:
+                results.append((outcome, time.perf_counter() - start))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, name=f"loadtest-{i}", daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = sorted(seconds for _, seconds in results)
+    ok_latencies = sorted(seconds for outcome, seconds in results if outcome == "ok")
+    total = len(results)
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "throughput_rps": round(outcomes["ok"] / elapsed, 3) if elapsed else 0.0,
+        "error_rate": round((total - outcomes["ok"]) / total, 4) if total else 0.0,
+        "outcomes": dict(outcomes),
+        "latency_s": {f"p{q}": _round(percentile(latencies, q)) for q in (50, 95, 99)},
+        "ok_latency_s": {f"p{q}": _round(percentile(ok_latencies, q)) for q in (50, 95, 99)},
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def ramp(target: str, stages: List[int], stage_seconds: float, pdf: bytes, keyword: str, location: str,
+         max_error_rate: float = 0.05, max_p95: Optional[float] = None, timeout: float = 300) -> Dict:
+    reports, limit = [], None
+    for concurrency in stages:
+        logger.info(f"🚦 Stage: {concurrency} concurrent uploads for {stage_seconds:.0f}s")
+        report = run_stage(target, concurrency, stage_seconds, pdf, keyword, location, timeout)
+        reports.append(report)
+        logger.info(f"   {report['throughput_rps']} uploads/s, p95 {report['latency_s']['p95']}s, "
+                    f"errors {report['error_rate']:.1%} {report['outcomes']}")
+        reasons = []
+        if report["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {report['error_rate']:.1%} > {max_error_rate:.1%}")
+        if max_p95 is not None and (report["latency_s"]["p95"] or 0) > max_p95:
+            reasons.append(f"p95 {report['latency_s']['p95']}s > {max_p95}s")
+        if reasons:
+            limit = {"concurrency": concurrency, "reasons": reasons}
+            break
+    best = max(reports, key=lambda r: r["throughput_rps"], default=None)
+    return {
+        "stages": reports,
+        "limit": limit,
+        "peak_throughput_rps": best["throughput_rps"] if best else 0.0,
+        "peak_at_concurrency": best["concurrency"] if best else None,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(kind: str, env: Dict[str, str], port: int, workdir: str, ready_timeout: float = 60) -> subprocess.Popen:
+    """
+    Start fapp (Flask, threaded) or aapp (aiohttp) with ``env`` in ``workdir``
+    and wait until it serves /. The apps write upload/ and output/ relative to
+    the working directory, so only the templates are linked in.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    frontend = os.path.join(workdir, "frontend")
+    if not os.path.exists(frontend):
+        os.symlink(os.path.join(ROOT_DIR, "frontend"), frontend)
+    if kind == "flask":
+        command = [sys.executable, "-m", "flask", "--app", "fapp", "run", "--port", str(port), "--with-threads"]
+    else:
+        command = [sys.executable, os.path.join(ROOT_DIR, "aapp.py"), "--port", str(port)]
+    pythonpath = os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get("PYTHONPATH")]))
+    process = subprocess.Popen(command, cwd=workdir, env={**os.environ, **env, "PYTHONPATH": pythonpath},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{kind} app exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{kind} app did not start within {ready_timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp concurrent /upload traffic and report latency and errors")
+    parser.add_argument("--target", help="Base URL of a running app; omit with --start-app")
+    parser.add_argument("--start-app", choices=["flask", "aapp"], help="Start the stubs and this app locally")
+    parser.add_argument("--stages", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--stage-seconds", type=float, default=30)
+    parser.add_argument("--resume", help="PDF to upload (default: first fixture in __DATA__)")
+    parser.add_argument("--keyword", default="", help="Job preference sent with each upload")
+    parser.add_argument("--location", default="")
+    parser.add_argument("--job-store-max-age", type=int,
+                        help="JOB_STORE_MAX_AGE for --start-app; 0 makes every upload crawl the board")
+    parser.add_argument("--workdir", help="Working directory for --start-app (default: a fresh temp dir)")
+    parser.add_argument("--max-error-rate", type=float, default=0.05)
+    parser.add_argument("--max-p95", type=float, help="Stop once p95 latency exceeds this many seconds")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument("--out", help="Write the JSON report here instead of stdout")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    if not args.target and not args.start_app:
+        parser.error("pass --target or --start-app")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    resume_path = args.resume or sorted(glob.glob(FIXTURE_PDFS))[0]
+    with open(resume_path, "rb") as f:
+        pdf = f.read()
+    stages = [int(level) for level in args.stages.split(",") if level.strip()]
+
+    stubs, process, target = None, None, args.target
+    try:
+        if args.start_app:
+            stubs = stubs_from_args(args).start()
+            env = stubs.env()
+            if args.job_store_max_age is not None:
+                env["JOB_STORE_MAX_AGE"] = str(args.job_store_max_age)
+            workdir = args.workdir or tempfile.mkdtemp(prefix="cvision-loadtest-")
+            port = _free_port()
+            process = start_app(args.start_app, env, port, workdir)
+            target = f"http://127.0.0.1:{port}"
+            logger.info(f"🧪 {args.start_app} on {target} in {workdir} with stubs {env}")
+        report = ramp(target, stages, args.stage_seconds, pdf, args.keyword, args.location,
+                      args.max_error_rate, args.max_p95, args.timeout)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        if stubs is not None:
+            stub_stats = stubs.stats()
+            stubs.stop()
+
+    report = {
+        "target": args.start_app or target,
+        "config": {key: value for key, value in vars(args).items() if key not in ("out", "target")},
+        **report,
+    }
+    if stubs is not None:
+        report["stubs"] = stub_stats
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# match_cache.py
+"""
+Cache of LLM match results, shared across requests.
+
+Many users search the same keyword and location and are scored against the
+same handful of jobs, often with very similar resumes (students from the
+same program, re-uploads with a changed phone number). Results are cached
+per job (its fingerprint plus a digest of its content, so an edited posting
+is scored again) and looked up two ways:
+
+- exactly, by a digest of the resume JSON that went into the prompt; an
+  exact hit always wins and may return every field the LLM produced;
+- by similarity, comparing a quantized hashed bag-of-words embedding of the
+  resume (contact details left out) against the resumes already scored for
+  that job. Only lookups that allow it (two-phase scoring, whose results
+  are just the score fields) use this, so reasoning written about one
+  person's resume is never shown to someone else. Only the match score is
+  taken from the similar resume; matched and missing skills are worked out
+  again from this resume's "Technical Skills", so a skill one resume lists
+  and the other lacks is never reported the wrong way round.
+
+Entries expire after ``ttl`` seconds. Lookups are counted with
+record_cache ("match" for exact, "match_similar" for the similarity
+fallback) and the similarity of every fuzzy hit is recorded, which is what
+to look at when tuning the threshold.
+"""
+import copy
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from resume_scraper.listing_registry import job_fingerprint, normalize
+from resume_scraper.metrics import REGISTRY, record_cache
+from resume_scraper.models import canonical_json
+
+# Left out of the embedding: they identify a person, not what they can do
+IDENTITY_FIELDS = ("Full Name", "Email Address", "Phone Number", "LinkedIn Profile URL")
+# Whole phrases from these lists are added as tokens next to their words
+PHRASE_FIELDS = ("Technical Skills", "Soft Skills", "Certifications")
+
+SIMILARITY_BUCKETS = (0.9, 0.95, 0.97, 0.98, 0.99, 0.995, 1.0)
+
+Vector = Dict[int, int]
+
+
+class ResumeKey(NamedTuple):
+    """What the cache needs from a resume; build it once per resume with MatchCache.resume_key()."""
+
+    digest: str
+    vector: Vector
+    norm: float
+    skills: Tuple[str, ...] = ()
+
+
+def _strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+
+
+def _tokens(resume: Mapping) -> Counter:
+    counts: Counter = Counter()
+    for field, value in resume.items():
+        if field in IDENTITY_FIELDS:
+            continue
+        for text in _strings(value):
+            normalized = normalize(text)
+            counts.update(normalized.split())
+            if field in PHRASE_FIELDS and " " in normalized:
+                counts[normalized] += 1
+    return counts
+
+
+def embed(resume: Mapping, dims: int = 1024) -> Tuple[Vector, float]:
+    """
+    Hashed bag-of-words embedding of a parsed resume, quantized to int8.
+
+    Each token is hashed to one of ``dims`` buckets with a hashed sign and a
+    1 + log(tf) weight; the vector is L2-normalized and scaled to [-127, 127].
+    Only non-zero buckets are kept.
+
+    Returns:
+        Tuple[Vector, float]: The sparse vector and its norm
+    """
+    dense: Dict[int, float] = {}
+    for token, count in _tokens(resume).items():
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+        index = h % dims
+        sign = 1.0 if (h >> 63) & 1 else -1.0
+        dense[index] = dense.get(index, 0.0) + sign * (1.0 + math.log(count))
+    length = math.sqrt(sum(value * value for value in dense.values()))
+    if not length:
+        return {}, 0.0
+    vector = {index: q for index, value in dense.items() if (q := round(value / length * 127))}
+    return vector, math.sqrt(sum(q * q for q in vector.values()))
+
+
+def similarity(a: ResumeKey, b: "_Entry") -> float:
+    if not a.norm or not b.norm:
+        return 0.0
+    small, large = (a.vector, b.vector) if len(a.vector) <= len(b.vector) else (b.vector, a.vector)
+    dot = sum(value * large.get(index, 0) for index, value in small.items())
+    return dot / (a.norm * b.norm)
+
+
+def _has_skill(skill: str, resume_skills: Tuple[str, ...]) -> bool:
+    """Whether a normalized skill matches one of the resume's, as a whole phrase either way round."""
+    padded = f" {skill} "
+    return any(padded in f" {own} " or f" {own} " in padded for own in resume_skills)
+
+
+def rematch_skills(details: Mapping, job: Mapping, resume: ResumeKey) -> Dict:
+    """
+    Keep only the match score of ``details`` (cached for a similar resume) and
+    split the skills it names, plus the job's required skills, into matched
+    and missing for ``resume``.
+    """
+    candidates = list(details.get("matched_skills") or []) + list(details.get("missing_skills") or [])
+    required = job.get("skills_required") or []
+    candidates += [required] if isinstance(required, str) else list(required)
+    matched, missing, seen = [], [], set()
+    for skill in candidates:
+        if not isinstance(skill, str) or not (key := normalize(skill)) or key in seen:
+            continue
+        seen.add(key)
+        (matched if _has_skill(key, resume.skills) else missing).append(skill)
+    return {"match_score": details.get("match_score"), "matched_skills": matched, "missing_skills": missing}
+
+
+def job_key(job: Mapping) -> str:
+    digest = hashlib.sha1(canonical_json(job).encode("utf-8")).hexdigest()[:12]
+    return f"{job_fingerprint(job)}:{digest}"
+
+
+class _Entry:
+    __slots__ = ("details", "vector", "norm", "created")
+
+    def __init__(self, details: Dict, resume: ResumeKey, created: float):
+        self.details = details
+        self.vector = resume.vector
+        self.norm = resume.norm
+        self.created = created
+
+
+class MatchCache:
+    """
+    Match details by (job, resume), with a similarity fallback.
+
+    Args:
+        threshold (float): Minimum cosine similarity between resume embeddings
+            for a similar resume's result to be reused (above 1 disables it)
+        ttl (float): Seconds an entry is reused for (0 disables the cache)
+        max_entries (int): Entries kept in total, least recently used dropped first
+        max_per_job (int): Resumes kept per job and kind of result; bounds the similarity scan
+        dims (int): Embedding size
+    """
+
+    def __init__(self, threshold: float = 0.97, ttl: float = 24 * 3600, max_entries: int = 20000,
+                 max_per_job: int = 64, dims: int = 1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_per_job = max_per_job
+        self.dims = dims
+        self._entries: "OrderedDict[Tuple[str, str, str], _Entry]" = OrderedDict()
+        # (kind, job key) -> resume digests, oldest first
+        self._by_job: Dict[Tuple[str, str], "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def resume_key(self, resume: Mapping, resume_json: Optional[str] = None) -> ResumeKey:
+        """``resume_json`` is the resume's JSON as sent in prompts; computed from ``resume`` if omitted."""
+        resume_json = canonical_json(resume) if resume_json is None else resume_json
+        vector, norm = embed(resume, self.dims)
+        skills = tuple(filter(None, (normalize(skill) for skill in _strings(resume.get("Technical Skills")))))
+        return ResumeKey(hashlib.sha1(resume_json.encode("utf-8")).hexdigest(), vector, norm, skills)
+
+    def get(self, kind: str, job: Mapping, resume: ResumeKey, similar: bool = False) -> Optional[Dict]:
+        """
+        Cached details for ``job`` scored against ``resume`` (a copy, safe to modify).
+
+        Args:
+            kind (str): What was cached, e.g. "score", "full" or "explain"
+            similar (bool): Fall back to the most similar resume above the threshold;
+                such a hit keeps only its match score, with the skill lists redone
+                for ``resume`` by rematch_skills()
+        """
+        if not self.enabled:
+            return None
+        bucket_key = (kind, job_key(job))
+        now = time.time()
+        details = None
+        with self._lock:
+            entry = self._live(bucket_key + (resume.digest,), now)
+            if entry is not None:
+                self._entries.move_to_end(bucket_key + (resume.digest,))
+                details = copy.deepcopy(entry.details)
+        record_cache("match", details is not None)
+        if details is not None or not similar or self.threshold > 1:
+            return details
+
+        best, best_score = None, self.threshold
+        with self._lock:
+            for digest in list(self._by_job.get(bucket_key, ())):
+                candidate = self._live(bucket_key + (digest,), now)
+                if candidate is None:
+                    continue
+                score = similarity(resume, candidate)
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                details = rematch_skills(best.details, job, resume)
+        record_cache("match_similar", best is not None)
+        if best is None:
+            return None
+        REGISTRY.observe("cvision_match_cache_similarity", best_score, buckets=SIMILARITY_BUCKETS, kind=kind)
+        return details
+
+    def put(self, kind: str, job: Mapping, resume: ResumeKey, details: Dict):
+        if not self.enabled or not details:
+            return
+        bucket_key = (kind, job_key(job))
+        entry = _Entry(copy.deepcopy(details), resume, time.time())
+        with self._lock:
+            self._entries[bucket_key + (resume.digest,)] = entry
+            self._entries.move_to_end(bucket_key + (resume.digest,))
+            digests = self._by_job.setdefault(bucket_key, OrderedDict())
+            digests[resume.digest] = None
+            digests.move_to_end(resume.digest)
+            while len(digests) > self.max_per_job:
+                self._drop(bucket_key + (next(iter(digests)),))
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_job.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _live(self, key: Tuple[str, str, str], now: float) -> Optional[_Entry]:
+        """The entry under ``key`` unless it expired (then it is dropped). Call with the lock held."""
+        entry = self._entries.get(key)
+        if entry is not None and now - entry.created > self.ttl:
+            self._drop(key)
+            return None
+        return entry
+
+    def _drop(self, key: Tuple[str, str, str]):
+        self._entries.pop(key, None)
+        digests = self._by_job.get(key[:2])
+        if digests is not None:
+            digests.pop(key[2], None)
+            if not digests:
+                del self._by_job[key[:2]]
+
+
+MATCH_CACHE = MatchCache(
+    threshold=float(os.getenv("MATCH_CACHE_THRESHOLD", 0.97)),
+    ttl=float(os.getenv("MATCH_CACHE_TTL", 24 * 3600)),
+)
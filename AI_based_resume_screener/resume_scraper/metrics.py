@@ -0,0 +1,241 @@
+# metrics.py
+"""
+Lightweight in-process instrumentation: counters, histograms, timing spans
+and per-request stage timings, rendered in the Prometheus text format.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+HELP = {
+    "cvision_stage_duration_seconds": "Time spent in each pipeline stage",
+    "cvision_stage_failures_total": "Pipeline stage invocations that raised",
+    "cvision_llm_calls_total": "LLM calls by backend and task",
+    "cvision_llm_failures_total": "LLM calls that raised",
+    "cvision_llm_duration_seconds": "LLM call latency",
+    "cvision_llm_prompt_chars_total": "Characters sent to LLMs",
+    "cvision_llm_response_chars_total": "Characters received from LLMs",
+    "cvision_llm_prompt_tokens_total": "Estimated tokens sent to LLMs",
+    "cvision_llm_response_tokens_total": "Estimated tokens received from LLMs",
+    "cvision_cache_requests_total": "Cache lookups by cache and result",
+    "cvision_requests_total": "Instrumented requests by outcome",
+    "cvision_llm_queue_depth": "LLM calls waiting for a backend slot",
+    "cvision_llm_in_flight": "LLM calls currently holding a backend slot",
+    "cvision_llm_queue_wait_seconds": "Time LLM calls waited for a backend slot",
+    "cvision_llm_shed_total": "LLM calls rejected because the queue exceeded its latency budget",
+    "cvision_llm_latency_p50_seconds": "Observed median LLM latency by backend and task",
+    "cvision_llm_latency_p95_seconds": "Observed 95th percentile LLM latency by backend and task",
+    "cvision_llm_hedges_total": "Hedged LLM requests sent to a second backend",
+    "cvision_llm_failovers_total": "LLM calls that failed and moved on to the next backend",
+    "cvision_match_cache_similarity": "Resume similarity of match results reused from a similar resume",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, buckets=DEFAULT_BUCKETS, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = _Histogram(buckets)
+            series[key].observe(value)
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge series (0 if unset)."""
+        key = _label_key(labels)
+        with self._lock:
+            for store in (self._counters, self._gauges):
+                if name in store and key in store[name]:
+                    return store[name][key]
+        return 0
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    if name in HELP:
+                        lines.append(f"# HELP {name} {HELP[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(store[name].items()):
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._histograms):
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_format_labels(key, {'le': f'{bound:g}'})} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': '+Inf'})} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stage timings of the request currently being handled (None outside a request)
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+# The timings dict is shared with the request's worker threads (resume parsing, prefetch)
+_timings_lock = threading.Lock()
+
+
+def _add_timing(key: str, value: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        with _timings_lock:
+            timings[key] = timings.get(key, 0) + value
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+@contextlib.contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block as pipeline ``stage``; failures are counted and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        REGISTRY.inc("cvision_stage_failures_total", stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe("cvision_stage_duration_seconds", elapsed, stage=stage)
+        _add_timing(stage, elapsed)
+
+
+def timed(stage: str):
+    """Decorator form of :func:`span`; works on plain and ``async`` functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_llm_call(backend: str, task: str, prompt: str, response: Optional[str],
+                    duration: float, failed: bool = False):
+    """Count one LLM call with its prompt/response sizes and latency."""
+    REGISTRY.inc("cvision_llm_calls_total", backend=backend, task=task)
+    REGISTRY.observe("cvision_llm_duration_seconds", duration, backend=backend, task=task)
+    REGISTRY.inc("cvision_llm_prompt_chars_total", len(prompt), backend=backend, task=task)
+    REGISTRY.inc("cvision_llm_prompt_tokens_total", estimate_tokens(prompt), backend=backend, task=task)
+    if failed:
+        REGISTRY.inc("cvision_llm_failures_total", backend=backend, task=task)
+    if response:
+        REGISTRY.inc("cvision_llm_response_chars_total", len(response), backend=backend, task=task)
+        REGISTRY.inc("cvision_llm_response_tokens_total", estimate_tokens(response), backend=backend, task=task)
+    _add_timing("llm_calls", 1)
+
+
+def record_cache(cache: str, hit: bool):
+    REGISTRY.inc("cvision_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+@contextlib.contextmanager
+def request_timer(request_id: str) -> Iterator[Dict[str, float]]:
+    """
+    Collect stage timings for one request and log them when it finishes.
+
+    Yields the timings dict so callers can add their own entries.
+    """
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield timings
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        _request_timings.reset(token)
+        with _timings_lock:
+            timings["total"] = time.perf_counter() - start
+            # Worker threads may still be finishing; log a snapshot
+            finished = dict(timings)
+        REGISTRY.inc("cvision_requests_total", outcome=outcome)
+        summary = " ".join(
+            f"{stage}={value:.2f}s" if stage != "llm_calls" else f"{stage}={int(value)}"
+            for stage, value in finished.items()
+        )
+        logger.info(f"⏱️ Request {request_id} timings: {summary}")
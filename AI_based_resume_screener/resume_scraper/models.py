@@ -0,0 +1,245 @@
+# models.py
+"""
+Compact records for jobs, parsed resumes and match results.
+
+``JobListing``, ``ResumeProfile`` and ``MatchResult`` keep their fields in
+``__slots__`` instead of a per-object dict, and are read-only ``Mapping``s
+with the same keys as the JSON the LLM produced, so code written against
+plain dicts (``job.get("job_title")``, ``job["requirements"]``, templates)
+works unchanged. Keys outside the schema are kept in a small side dict.
+
+Each record caches its canonical JSON (schema key order, compact
+separators), so a job is serialized once no matter how many prompts,
+stores and result files it ends up in; ``MatchResult`` holds a reference
+to its job instead of copying every field next to ``match_details``.
+
+Lists of records are serialized as JSONL, or as the compact binary
+``.cvb`` format the job store keeps its jobs in: a zlib-compressed stream
+of rows in schema field order, so keys are not repeated per record.
+
+``JobListing`` and ``ResumeProfile`` are immutable once created; build a
+new one to change a field. A ``MatchResult`` shares its job but its
+``details`` is a plain dict, filled in as explanations arrive.
+"""
+import json
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from resume_scraper.listing_registry import fingerprint_of
+from resume_scraper.structured_output import JOB_DETAILS_SCHEMA, RESUME_SCHEMA
+
+_MISSING = object()
+_SEPARATORS = (",", ":")
+
+CVB_MAGIC = b"CVB1"
+
+
+def _attr_name(key: str) -> str:
+    return "_".join(key.lower().split())
+
+
+class _Record(Mapping):
+    """Read-only mapping over slots; subclasses define FIELDS (JSON key, attribute)."""
+
+    __slots__ = ("_extra", "_json")
+    FIELDS: Tuple[Tuple[str, str], ...] = ()
+    _ATTRS: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._ATTRS = dict(cls.FIELDS)
+
+    def __init__(self, data: Optional[Mapping] = None, **fields: Any):
+        values = dict(data or {}, **fields)
+        for key, attr in self.FIELDS:
+            setattr(self, attr, values.pop(key, _MISSING))
+        self._extra = values or None
+        self._json = None
+
+    @classmethod
+    def coerce(cls, value: Mapping):
+        """Return ``value`` if it already is a ``cls``, otherwise build one from it."""
+        return value if isinstance(value, cls) else cls(value)
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._ATTRS.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, attr in self.FIELDS:
+            if getattr(self, attr) is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self[key] for key in self}
+
+    def canonical_json(self) -> str:
+        """Compact JSON in schema key order, computed once per record."""
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), ensure_ascii=False, separators=_SEPARATORS)
+        return self._json
+
+    def to_row(self) -> List[Any]:
+        """Field values in FIELDS order (None when missing), plus the extra keys if any."""
+        row = [None if value is _MISSING else value for value in (getattr(self, attr) for _, attr in self.FIELDS)]
+        if self._extra:
+            row.append(self._extra)
+        return row
+
+    @classmethod
+    def from_row(cls, row: List[Any]):
+        record = cls.__new__(cls)
+        for (_, attr), value in zip(cls.FIELDS, row):
+            setattr(record, attr, _MISSING if value is None else value)
+        extra = row[len(cls.FIELDS)] if len(row) > len(cls.FIELDS) else None
+        record._extra = dict(extra) if extra else None
+        record._json = None
+        return record
+
+
+class JobListing(_Record):
+    """One extracted job posting (JOB_DETAILS_SCHEMA)."""
+
+    FIELDS = tuple((key, _attr_name(key)) for key in JOB_DETAILS_SCHEMA["properties"])
+    __slots__ = tuple(attr for _, attr in FIELDS) + ("_fingerprint",)
+
+    def __init__(self, data: Optional[Mapping] = None, **fields: Any):
+        super().__init__(data, **fields)
+        self._fingerprint = None
+
+    @classmethod
+    def from_row(cls, row: List[Any]):
+        record = super().from_row(row)
+        record._fingerprint = None
+        return record
+
+    @property
+    def fingerprint(self) -> str:
+        """Posting identity used for de-duplication (see listing_registry.job_fingerprint)."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint_of(self)
+        return self._fingerprint
+
+
+class ResumeProfile(_Record):
+    """A parsed resume (RESUME_SCHEMA); ``error`` or ``partial`` flags stay as extra keys."""
+
+    FIELDS = tuple((key, _attr_name(key)) for key in RESUME_SCHEMA["properties"])
+    __slots__ = tuple(attr for _, attr in FIELDS)
+
+
+class MatchResult(Mapping):
+    """
+    A job with its ``match_details``. Reads like ``{**job, "match_details": details}``
+    but shares the job record instead of copying it.
+    """
+
+    __slots__ = ("job", "details")
+
+    def __init__(self, job: Mapping, details: Dict[str, Any]):
+        self.job = JobListing.coerce(job)
+        self.details = details
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "match_details":
+            return self.details
+        return self.job[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.job
+        yield "match_details"
+
+    def __len__(self) -> int:
+        return len(self.job) + 1
+
+    def __repr__(self) -> str:
+        return f"MatchResult({self.job!r}, {self.details!r})"
+
+    @property
+    def match_score(self) -> int:
+        return self.details.get("match_score", 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.job.to_dict(), "match_details": self.details}
+
+    def canonical_json(self) -> str:
+        """The job's cached JSON with ``match_details`` appended; details may still change, so not cached."""
+        job_json = self.job.canonical_json()
+        details_json = json.dumps(self.details, ensure_ascii=False, separators=_SEPARATORS)
+        prefix = job_json[:-1] + ("," if len(job_json) > 2 else "")
+        return f'{prefix}"match_details":{details_json}}}'
+
+
+RECORD_TYPES: Dict[str, Type[_Record]] = {cls.__name__: cls for cls in (JobListing, ResumeProfile)}
+
+
+def canonical_json(value: Any) -> str:
+    """Compact JSON for a record (cached) or any other JSON value."""
+    if isinstance(value, (_Record, MatchResult)):
+        return value.canonical_json()
+    return json.dumps(value, ensure_ascii=False, separators=_SEPARATORS)
+
+
+def to_jsonable(value: Any) -> Any:
+    """Plain dicts and lists for code that needs real JSON types (e.g. json.dump)."""
+    if isinstance(value, (_Record, MatchResult)):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def dumps_json_list(records: Iterable[Any]) -> str:
+    return "[" + ",".join(canonical_json(record) for record in records) + "]"
+
+
+def dumps_jsonl(records: Iterable[Any]) -> str:
+    return "\n".join(canonical_json(record) for record in records)
+
+
+def loads_jsonl(text: str, cls: Type[_Record] = JobListing) -> List[_Record]:
+    return [cls(json.loads(line)) for line in text.splitlines() if line.strip()]
+
+
+def dumps_cvb(records: Iterable[_Record], cls: Type[_Record] = JobListing) -> bytes:
+    header = {"type": cls.__name__, "fields": [key for key, _ in cls.FIELDS]}
+    lines = [json.dumps(header)]
+    lines.extend(json.dumps(cls.coerce(record).to_row(), ensure_ascii=False, separators=_SEPARATORS)
+                 for record in records)
+    return CVB_MAGIC + zlib.compress("\n".join(lines).encode("utf-8"))
+
+
+def loads_cvb(data: bytes) -> List[_Record]:
+    if not data.startswith(CVB_MAGIC):
+        raise ValueError("Not a .cvb record file")
+    lines = zlib.decompress(data[len(CVB_MAGIC):]).decode("utf-8").split("\n")
+    header = json.loads(lines[0])
+    cls = RECORD_TYPES[header["type"]]
+    if header["fields"] != [key for key, _ in cls.FIELDS]:
+        # Written with a different schema: go through the keys instead of positions
+        return [cls({key: value for key, value in zip(header["fields"], json.loads(line)) if value is not None})
+                for line in lines[1:]]
+    return [cls.from_row(json.loads(line)) for line in lines[1:]]
+
+
+def read_records(path: str, cls: Type[_Record] = JobListing) -> List[_Record]:
+    """Read records from a .jsonl file or (anything else) a JSON list of objects."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return loads_jsonl(f.read(), cls)
+        return [cls(item) for item in json.load(f) if item]
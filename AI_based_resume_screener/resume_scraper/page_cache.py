@@ -0,0 +1,204 @@
+# page_cache.py
+"""
+Cache of rendered HTML pages, shared by the Flask and aiohttp apps.
+
+Results pages are keyed by result ID and the SHA-1 of the saved results
+file. A repeat view whose file has not changed (checked with os.stat) is
+served from memory without parsing the JSON or rendering the template. The
+ETag is built from the same key, so a browser sending ``If-None-Match``
+gets a bodiless 304.
+
+Template-only pages (index.html, upload.html) are rendered once per
+process. Every page is compressed at most once per encoding (brotli or
+gzip, whichever the client accepts), so repeat views cost neither CPU nor
+full-size bandwidth.
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from resume_scraper.metrics import record_cache
+
+RESULTS_DIR = os.path.join("output", "results")
+# Most recent results, kept for /results without an ID and for existing readers of the file
+LATEST_RESULTS_PATH = os.path.join("output", "top_5_matched_jobs.json")
+_RESULT_ID = re.compile(r"^[0-9a-f]{8,32}$")
+
+
+def results_path(result_id: str = "") -> Optional[str]:
+    """File holding ``result_id``'s matches; the latest results for an empty ID, None if the ID is invalid."""
+    if not result_id:
+        return LATEST_RESULTS_PATH
+    if not _RESULT_ID.match(result_id):
+        return None
+    return os.path.join(RESULTS_DIR, f"{result_id}.json")
+
+
+def save_results(result_id: str, payload: str):
+    """Write a results page's JSON under its ID and as the latest results."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    for path in (results_path(result_id), LATEST_RESULTS_PATH):
+        # Write then rename so a concurrent view never reads a half-written file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+
+def _brotli(body: bytes) -> bytes:
+    import brotli
+
+    return brotli.compress(body, quality=5)
+
+
+_COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "br": _brotli,
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+}
+
+
+def accepted_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding we can produce that the client accepts (brotli, then gzip)."""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip())
+    for encoding in _COMPRESSORS:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+class RenderedPage:
+    """Rendered HTML plus its ETag and the compressed variants built so far."""
+
+    __slots__ = ("body", "etag", "_encoded", "_lock")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.body
+        with self._lock:
+            if encoding not in self._encoded:
+                self._encoded[encoding] = _COMPRESSORS[encoding](self.body)
+            return self._encoded[encoding]
+
+    def response_parts(self, if_none_match: Optional[str], accept_encoding: Optional[str],
+                       cache_control: str = "no-cache") -> Tuple[int, bytes, Dict[str, str]]:
+        """``(status, body, headers)`` for a GET: 304 if the client's copy is current."""
+        headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(if_none_match, self.etag):
+            return 304, b"", headers
+        encoding = accepted_encoding(accept_encoding)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return 200, self.encoded(encoding), headers
+
+
+def _page(body: str, key: str) -> RenderedPage:
+    return RenderedPage(body.encode("utf-8"), f'"{key}"')
+
+
+class ResultsPageCache:
+    """
+    LRU of rendered results pages keyed by ``(result_id, content hash)``.
+
+    Args:
+        max_entries (int): Pages kept in memory
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[Tuple[str, str], RenderedPage]" = OrderedDict()
+        # path -> (mtime_ns, size, content hash), so an unchanged file is not even read
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _known_hash(self, path: str) -> Optional[str]:
+        stat = os.stat(path)
+        with self._lock:
+            known = self._hashes.get(path)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        return None
+
+    def get(self, result_id: str, path: str, render: Callable[[bytes], str]) -> RenderedPage:
+        """
+        The rendered page for the results file at ``path``; ``render`` turns the
+        file's bytes into HTML and is only called on a miss.
+
+        Raises:
+            FileNotFoundError: If there are no results at ``path``
+        """
+        name = result_id or "latest"
+        digest = self._known_hash(path)
+        if digest is not None:
+            with self._lock:
+                page = self._pages.get((name, digest))
+                if page is not None:
+                    self._pages.move_to_end((name, digest))
+            if page is not None:
+                record_cache("results_page", True)
+                return page
+
+        record_cache("results_page", False)
+        stat = os.stat(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()[:16]
+        page = _page(render(data), f"{name}-{digest}")
+        with self._lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+            self._pages[(name, digest)] = page
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+            # Keep the hash table bounded together with the pages
+            if len(self._hashes) > 4 * self.max_entries:
+                self._hashes.clear()
+        return page
+
+
+class StaticPageCache:
+    """Template-only pages, rendered on first request and then served as-is."""
+
+    def __init__(self):
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, render: Callable[[], str]) -> RenderedPage:
+        page = self._pages.get(name)
+        if page is None:
+            body = render()
+            page = _page(body, f"{name}-{hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]}")
+            with self._lock:
+                page = self._pages.setdefault(name, page)
+        return page
+
+
+RESULTS_PAGES = ResultsPageCache()
+STATIC_PAGES = StaticPageCache()
@@ -0,0 +1,272 @@
+# pipeline.py
+"""
+Streaming stages for the scrape -> match pipeline.
+
+Each stage is a generator that pulls from the previous one, so a job can be
+filtered and scored while later pages are still being crawled and extracted,
+and only the items in flight are held in memory:
+
+    pages -> cleaned text -> segments -> jobs -> unique -> filtered -> scored
+
+Stages are plain generators and therefore lazy: when a downstream stage stops
+early (e.g. ``filtered`` has found enough jobs) nothing more is crawled or
+extracted. ``prefetch`` runs an upstream part of the chain in a background
+thread behind a bounded queue, which overlaps the stages while keeping
+backpressure.
+
+The ``a``-prefixed stages are the asyncio counterparts used by the async app
+(aapp.py); ``athreaded`` bridges a blocking generator such as crawl_pages
+into them without blocking the event loop.
+"""
+import asyncio
+import contextlib
+import contextvars
+import logging
+import queue
+import threading
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+
+from resume_scraper.listing_registry import job_fingerprint
+from resume_scraper.profiling import run_profiled
+from resume_scraper.scraper import clean_body_content, split_dom_content
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _close(items: Iterable):
+    close = getattr(items, "close", None)
+    if close:
+        close()
+
+
+async def _aclose(items: AsyncIterable):
+    aclose = getattr(items, "aclose", None)
+    if aclose:
+        await aclose()
+
+
+def cleaned(pages: Iterable[str]) -> Iterator[str]:
+    for html in pages:
+        yield clean_body_content(html)
+
+
+def segments(texts: Iterable[str], max_chars: int = 2000) -> Iterator[str]:
+    for text in texts:
+        yield from split_dom_content(text, max_chars=max_chars)
+
+
+def jobs(chunks: Iterable[str], extract: Callable[[str], Optional[Dict]], registry=None,
+         source: str = "", failed: Optional[List[str]] = None) -> Iterator[Dict]:
+    """
+    Extract jobs from each chunk, reusing the registry's earlier extractions.
+    ``extract`` returns None when extraction failed; such chunks are not
+    recorded, so they are extracted again next time, and are appended to
+    ``failed`` if given.
+    """
+    for chunk in chunks:
+        found = registry.lookup_chunk(chunk) if registry is not None else None
+        if found is None:
+            job = extract(chunk)
+            if job is None:
+                if failed is not None:
+                    failed.append(chunk)
+                continue
+            found = [job] if job else []
+            if registry is not None:
+                registry.record_chunk(chunk, found, source=source)
+        yield from found
+
+
+def unique(listings: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop postings whose fingerprint was already seen in this stream."""
+    seen = set()
+    try:
+        for job in listings:
+            fingerprint = job_fingerprint(job)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                yield job
+    finally:
+        _close(listings)
+
+
+def filtered(listings: Iterable[Dict], predicate: Callable[[Dict], bool], limit: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Yield jobs passing ``predicate``; after ``limit`` the upstream is closed,
+    which stops a prefetch thread behind it instead of letting it fill its buffer.
+    """
+    try:
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for job in listings:
+            if predicate(job):
+                yield job
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        _close(listings)
+
+
+def scored(listings: Iterable[Dict], score: Callable[[Dict], Dict]) -> Iterator[Dict]:
+    try:
+        for job in listings:
+            yield score(job)
+    finally:
+        _close(listings)
+
+
+def collect(items: Iterable, into: List) -> Iterator:
+    """Pass items through while also appending them to ``into``."""
+    try:
+        for item in items:
+            into.append(item)
+            yield item
+    finally:
+        _close(items)
+
+
+def prefetch(items: Iterable, maxsize: int = 4) -> Iterator:
+    """
+    Run ``items`` in a background thread, buffering at most ``maxsize``
+    results. The producer blocks when the buffer is full, and is stopped (and
+    the upstream generator closed) if the consumer stops early.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def produce():
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                while not stop.is_set():
+                    try:
+                        buffer.put((item, None), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    break
+        except Exception as e:
+            buffer.put((_DONE, e))
+            return
+        finally:
+            _close(iterator)
+        buffer.put((_DONE, None))
+
+    # Run in a copy of the caller's context so request-scoped timings and profiling still apply
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(run_profiled, produce),
+                              name="pipeline-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full buffer so it can notice the stop
+        while thread.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
+
+
+async def athreaded(items: Iterable) -> AsyncIterator:
+    """Pull a blocking iterator one item at a time in the loop's executor."""
+    loop = asyncio.get_running_loop()
+    iterator = iter(items)
+    context = contextvars.copy_context()
+    pending = None
+    try:
+        while True:
+            pending = loop.run_in_executor(None, context.run, next, iterator, _DONE)
+            # Shielded so a cancelled consumer cannot close the generator while a worker is inside it
+            item = await asyncio.shield(pending)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        close = getattr(iterator, "close", None)
+        if close:
+            await loop.run_in_executor(None, close)
+
+
+async def aunique(listings: AsyncIterable[Dict]) -> AsyncIterator[Dict]:
+    seen = set()
+    try:
+        async for job in listings:
+            fingerprint = job_fingerprint(job)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                yield job
+    finally:
+        await _aclose(listings)
+
+
+async def afiltered(listings: AsyncIterable[Dict], predicate: Callable[[Dict], bool],
+                    limit: Optional[int] = None) -> AsyncIterator[Dict]:
+    try:
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        async for job in listings:
+            if predicate(job):
+                yield job
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+    finally:
+        await _aclose(listings)
+
+
+async def acollect(items: AsyncIterable, into: List) -> AsyncIterator:
+    try:
+        async for item in items:
+            into.append(item)
+            yield item
+    finally:
+        await _aclose(items)
+
+
+async def aprefetch(items: AsyncIterable, maxsize: int = 4) -> AsyncIterator:
+    """
+    Drive ``items`` in a separate task, buffering at most ``maxsize`` results,
+    so upstream work continues while the consumer awaits something else.
+    """
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    async def produce():
+        try:
+            async for item in items:
+                await buffer.put((item, None))
+        except Exception as e:
+            await buffer.put((_DONE, e))
+            return
+        finally:
+            await _aclose(items)
+        await buffer.put((_DONE, None))
+
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            item, error = await buffer.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
@@ -0,0 +1,270 @@
+# profiling.py
+"""
+Opt-in profiling of a single request.
+
+Two modes are supported:
+  - "cprofile": deterministic cProfile of the request thread, saved as
+    <request_id>.prof (loadable with pstats/snakeviz) plus a text summary.
+  - "sampling": a background thread samples the request thread's stack and
+    saves folded stacks to <request_id>.folded, the input format of
+    flamegraph.pl / speedscope / inferno.
+
+Work the request hands to other threads (resume parsing, the prefetch
+stage) is included when those threads run inside ``profiled_thread()``
+with a copy of the request's context: each gets its own cProfile, merged
+into the request's stats, or is sampled alongside the request thread with
+its thread name as the root frame.
+"""
+import contextlib
+import contextvars
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join("output", "profiles")
+PROFILE_MODES = ("cprofile", "sampling")
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def requested_mode(header_value: Optional[str], default_mode=None) -> Optional[str]:
+    """
+    Resolve the profiling mode from the request header or app config.
+
+    Args:
+        header_value (Optional[str]): Value of the X-Profile header
+        default_mode: Config value; falsy disables profiling
+
+    Returns:
+        Optional[str]: "cprofile", "sampling" or None
+    """
+    value = (header_value or "").strip().lower() or default_mode
+    if not value or value in ("0", "false", "off"):
+        return None
+    if value in ("1", "true", "on"):
+        return "cprofile"
+    return value if value in PROFILE_MODES else None
+
+
+def profile_path(request_id: str, suffix: str, out_dir: str = PROFILE_DIR) -> Optional[str]:
+    """Path of a saved profile, or None if the request ID is not safe to use."""
+    if not _REQUEST_ID.match(request_id):
+        return None
+    return os.path.join(out_dir, f"{request_id}{suffix}")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Samples a thread's stack every ``interval`` seconds into folded stacks.
+    Threads added with add_thread are sampled too, under their name as root frame.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._threads: Dict[int, Optional[str]] = {thread_id: None}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def add_thread(self, thread_id: int, name: str):
+        with self._threads_lock:
+            self._threads[thread_id] = name
+
+    def remove_thread(self, thread_id: int):
+        with self._threads_lock:
+            self._threads.pop(thread_id, None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                threads = list(self._threads.items())
+            frames = sys._current_frames()
+            for thread_id, root in threads:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if stack:
+                    if root:
+                        stack.append(root)
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class _RequestProfile:
+    """The profiler(s) of one request, reachable from its worker threads through the context."""
+
+    def __init__(self, mode: str):
+        self.sampler = SamplingProfiler(threading.get_ident()) if mode == "sampling" else None
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def thread(self) -> Iterator[None]:
+        thread = threading.current_thread()
+        if self.sampler is not None:
+            self.sampler.add_thread(thread.ident, thread.name)
+            try:
+                yield
+            finally:
+                self.sampler.remove_thread(thread.ident)
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile, and it already covers every thread
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.profilers.append(profiler)
+
+
+_active_profile: contextvars.ContextVar[Optional[_RequestProfile]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+
+@contextlib.contextmanager
+def profiled_thread() -> Iterator[None]:
+    """Include the current worker thread in the profile of the request whose context it runs in, if any."""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.thread():
+        yield
+
+
+def run_profiled(func, *args, **kwargs):
+    """Call ``func`` inside profiled_thread(); submit it to a pool with ``contextvars.copy_context().run``."""
+    with profiled_thread():
+        return func(*args, **kwargs)
+
+
+@contextlib.contextmanager
+def profile_request(request_id: str, mode: str = "cprofile", out_dir: str = PROFILE_DIR) -> Iterator[None]:
+    """Profile the enclosed block (and workers using profiled_thread) and write the result under ``out_dir``."""
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    profiler = None
+    if mode != "sampling":
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one active cProfile per process; another request holds it
+            logger.warning(f"cProfile is busy, sampling request {request_id} instead")
+            profiler, mode = None, "sampling"
+    profile = _RequestProfile(mode)
+    token = _active_profile.set(profile)
+    try:
+        if profile.sampler is not None:
+            profile.sampler.start()
+            try:
+                yield
+            finally:
+                profile.sampler.stop()
+                with open(profile_path(request_id, ".folded", out_dir), "w") as f:
+                    f.write(profile.sampler.folded())
+        else:
+            try:
+                yield
+            finally:
+                profiler.disable()
+                with profile._lock:
+                    profilers = [profiler] + profile.profilers
+                _merged_stats(profilers).dump_stats(profile_path(request_id, ".prof", out_dir))
+                with open(profile_path(request_id, ".txt", out_dir), "w") as f:
+                    f.write(summarize_stats(*profilers))
+    finally:
+        _active_profile.reset(token)
+    logger.info(f"🔬 Saved {mode} profile for request {request_id} "
+                f"({time.perf_counter() - start:.2f}s) to {out_dir}")
+
+
+def _merged_stats(profiles, stream=None) -> pstats.Stats:
+    stats = pstats.Stats(profiles[0], stream=stream)
+    for profile in profiles[1:]:
+        stats.add(profile)
+    return stats
+
+
+def summarize_stats(*profiles, limit: int = 40) -> str:
+    """Top functions by cumulative time, over all ``profiles``, as text."""
+    stream = io.StringIO()
+    stats = _merged_stats(profiles, stream=stream)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+
+def folded_to_tree(folded: str) -> Dict:
+    """
+    Build a nested {name, value, children} tree from folded stacks for the
+    flame graph viewer.
+    """
+    root = {"name": "all", "value": 0, "children": {}}
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack or not count.isdigit():
+            continue
+        samples = int(count)
+        root["value"] += samples
+        node = root
+        for name in stack.split(";"):
+            child = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+            child["value"] += samples
+            node = child
+    return root
+
+
+def flatten_tree(root: Dict, min_fraction: float = 0.005) -> List[Dict]:
+    """
+    Lay out the tree as flame graph rectangles (depth, x offset and width as
+    fractions of the total), dropping frames narrower than ``min_fraction``.
+    """
+    total = root["value"] or 1
+    rects = []
+
+    def visit(node, depth, offset):
+        width = node["value"] / total
+        if width < min_fraction:
+            return
+        rects.append({"name": node["name"], "depth": depth, "x": offset, "width": width, "samples": node["value"]})
+        child_offset = offset
+        for child in sorted(node["children"].values(), key=lambda c: c["name"]):
+            visit(child, depth + 1, child_offset)
+            child_offset += child["value"] / total
+
+    visit(root, 0, 0.0)
+    return rects
@@ -1,49 +1,17 @@
 # resume_praser.py
-import google.generativeai as genai
 import os
 import json
-import re
-from pypdf import PdfReader
-api_key = os.getenv("GEMINI_API_KEY")
+from resume_scraper.structured_output import parse_json_response, RESUME_SCHEMA
+from resume_scraper.lazy import load_genai, ollama_factory
+from resume_scraper.llm_router import LLMRouter, GeminiBackend, LangChainBackend
+from resume_scraper.llm_scheduler import Overloaded
+from resume_scraper.resume_preparser import preparse_resume, llm_input, merge_fields, partial_profile
 
-if not api_key:
-    print("API key is not found. Please set the GEMINI_API_KEY environment variable.")
-    
-genai.configure(api_key=api_key)
-
-def clean_json_response(text):
-    """
-    Cleans the AI response to extract valid JSON content.
-    """
- 
-    text = text.replace("```json", "").replace("```", "")
-    
+# google.generativeai is imported and configured on the first Gemini call (see lazy.load_genai);
+# assign a module here (e.g. FakeGenAI) to use it instead
+genai = None
 
-    try:
-        start = text.index('{')
-        end = text.rindex('}') + 1
-        json_str = text[start:end]
-        
-        
-        json_str = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', json_str)
-        
-        return json_str
-    except ValueError:
-        return text  
-
-def ats_extractor(resume_data):
-    """
-    Extracts ATS-friendly information from the resume data.
-    
-    Args:
-        resume_data (str): The resume data in string format.
-        
-    Returns:
-        dict: A dictionary containing extracted information.
-    """
-    
-
-    prompt = """
+ATS_PROMPT = """
    You are an ATS (Applicant Tracking System) that reads resumes and extracts relevant information.
     From the given resume data, extract the following information and return it in valid JSON format:
     {
@@ -84,27 +52,98 @@ def ats_extractor(resume_data):
     8. Pay special attention to extracting all projects mentioned in the resume
     9. For projects, focus on identifying personal projects, academic projects, open-source contributions, etc.
     """
+
+
+def _resume_model():
+    # JSON mode keeps Gemini from wrapping the object in prose or markdown
+    return (genai or load_genai()).GenerativeModel(
+        "gemini-2.0-flash",
+        generation_config={"response_mime_type": "application/json"}
+    )
+
+
+def _resume_prompt(resume_data):
+    return f"{ATS_PROMPT} \n\n Resume Text:\n {resume_data}"
+
+
+def _gemini_configured():
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+_router = None
+
+
+def get_router():
+    """Router for resume parsing: Gemini first, local Ollama when Gemini is missing, failing or slow."""
+    global _router
+    if _router is None:
+        _router = LLMRouter({
+            # A custom GEMINI_API_ENDPOINT is reached over REST, which has no async client
+            "gemini": GeminiBackend("gemini", _resume_model, cost=1.0, available=_gemini_configured,
+                                    native_async=not os.getenv("GEMINI_API_ENDPOINT")),
+            "ollama": LangChainBackend(
+                "ollama", client_factory=ollama_factory(os.getenv("OLLAMA_RESUME_MODEL", "llama3.2"), format="json")
+            ),
+        })
+    return _router
+
+
+def _parse_resume_response(text):
+    parsed_data = parse_json_response(text, RESUME_SCHEMA)
+    if not parsed_data:
+        raise ValueError("Could not parse resume JSON from AI response")
+    return parsed_data
+
+
+def _fallback(preparsed, error, response):
+    """What the rules recovered when the LLM failed, or the error if that is too little to match on."""
+    partial = partial_profile(preparsed)
+    if partial["Technical Skills"] or partial["Education"]:
+        print(f"Error in AI processing, returning rule-based fields only: {error}")
+        partial["partial"] = True
+        return partial
+    print(f"Error in AI processing: {error}")
+    return {
+        "error": str(error),
+        "raw_response": response
+    }
+
+
+def ats_extractor(resume_data):
+    """
+    Extracts ATS-friendly information from the resume data.
     
-    model = genai.GenerativeModel("gemini-2.0-flash")
-    
-    try:
-        response = model.generate_content([
-            {"role": "user", 
-             "parts": [f"{prompt} \n\n Resume Text:\n {resume_data}"]}
-        ])
-        
-   
-        cleaned_response = clean_json_response(response.text)
-        parsed_data = json.loads(cleaned_response)
-        
-        return parsed_data
+    Args:
+        resume_data (str): The resume data in string format.
         
+    Returns:
+        dict: A dictionary containing extracted information.
+    """
+    # Contact details come from regexes; the LLM only reads the sections it has to interpret
+    preparsed = preparse_resume(resume_data)
+    response = None
+    try:
+        response = get_router().invoke("resume_parse", _resume_prompt(llm_input(preparsed, resume_data)))
+        return merge_fields(_parse_resume_response(response), preparsed)
+
+    except Overloaded:
+        raise
+    except Exception as e:
+        return _fallback(preparsed, e, response)
+
+
+async def ats_extractor_async(resume_data):
+    """Same as ats_extractor, but awaits the LLM instead of blocking a thread."""
+    preparsed = preparse_resume(resume_data)
+    response = None
+    try:
+        response = await get_router().ainvoke("resume_parse", _resume_prompt(llm_input(preparsed, resume_data)))
+        return merge_fields(_parse_resume_response(response), preparsed)
+
+    except Overloaded:
+        raise
     except Exception as e:
-        print(f"Error in AI processing: {e}")
-        return {
-            "error": str(e),
-            "raw_response": response.text if 'response' in locals() else None
-        }
+        return _fallback(preparsed, e, response)
 
 # def extract_text_from_pdf(file_path):
 #     """Extracts all text from a PDF using pypdf"""
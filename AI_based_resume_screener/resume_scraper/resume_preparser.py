@@ -0,0 +1,199 @@
+# resume_preparser.py
+"""
+Rule-based pre-parsing of resume text.
+
+Contact details (email, phone, LinkedIn URL, name) are pulled out with
+regular expressions, and the text is split into sections on common headings
+such as "Education" or "Professional Experience". ats_extractor then only
+sends the sections the LLM actually has to interpret, and if the LLM call
+fails the fields recovered here are still returned.
+"""
+import re
+from typing import Dict, List, Optional
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/[\w%-]+/?", re.IGNORECASE)
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{6,}\d(?![\w/])")
+# Skill-level markers left behind by resume builders ("— Proficient")
+_RATING_RE = re.compile(r"^[—–-]\s*\w+$")
+DATE_RANGE_RE = re.compile(r"\d{2}/\d{4}|\b(?:19|20)\d{2}\s*[–-]\s*(?:(?:19|20)\d{2}|present)\b", re.IGNORECASE)
+
+# Section heading (as it appears, lower-cased) -> canonical section name
+SECTION_HEADINGS = {
+    "profile": "profile",
+    "summary": "profile",
+    "professional summary": "profile",
+    "objective": "profile",
+    "career objective": "profile",
+    "about me": "profile",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "employment history": "experience",
+    "work history": "experience",
+    "education": "education",
+    "academic background": "education",
+    "skills": "skills",
+    "technical skills": "skills",
+    "core competencies": "skills",
+    "soft skills": "skills",
+    "projects": "projects",
+    "personal projects": "projects",
+    "academic projects": "projects",
+    "certifications": "certifications",
+    "certificates": "certifications",
+    "licenses & certifications": "certifications",
+    "courses": "certifications",
+    "workshop": "certifications",
+    "workshops": "certifications",
+    "training": "certifications",
+    "references": "references",
+    "languages": "other",
+    "interests": "other",
+    "hobbies": "other",
+    "awards": "other",
+    "achievements": "other",
+    "volunteering": "other",
+    "activities": "other",
+}
+
+# Sections the LLM still has to read; contact details and references are not sent
+LLM_SECTIONS = ("profile", "experience", "education", "skills", "projects", "certifications", "other")
+
+_HEADING_WORDS = sorted({heading.title() for heading in SECTION_HEADINGS}, key=len, reverse=True)
+# PDF extraction sometimes glues a heading onto the end of the previous line ("— ProficientProjects")
+_GLUED_HEADING_RE = re.compile(r"(?<=[a-z])(" + "|".join(re.escape(h) for h in _HEADING_WORDS) + r")$")
+
+
+def _heading(line: str) -> Optional[str]:
+    key = re.sub(r"[^\w&\s]", "", line).strip().lower()
+    return SECTION_HEADINGS.get(key)
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    Split resume text on section headings. Text before the first heading is
+    returned as "header"; repeated sections (e.g. two "other" blocks) are joined.
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        glued = _GLUED_HEADING_RE.search(line)
+        if glued and _heading(glued.group(1)):
+            sections.setdefault(current, []).append(line[:glued.start()])
+            line = glued.group(1)
+        section = _heading(line) if len(line) <= 40 else None
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(l for l in lines if l).strip() for name, lines in sections.items()}
+
+
+def _first(pattern: re.Pattern, *texts: str) -> str:
+    for text in texts:
+        match = pattern.search(text or "")
+        if match:
+            return match.group(0).strip()
+    return ""
+
+
+def _phone(*texts: str) -> str:
+    for text in texts:
+        for match in PHONE_RE.finditer(text or ""):
+            candidate = match.group(0).strip()
+            digits = re.sub(r"\D", "", candidate)
+            # Skip dates and years that happen to look like digit runs
+            if 7 <= len(digits) <= 15 and not DATE_RANGE_RE.search(candidate):
+                return candidate
+    return ""
+
+
+def _name(header: str) -> str:
+    for line in header.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(re.fullmatch(r"[^\W\d_][\w.'-]*", w) for w in words):
+            return line
+        return ""
+    return ""
+
+
+def preparse_resume(text: str) -> Dict:
+    """
+    Returns:
+        Dict: ``fields`` (the RESUME_SCHEMA contact fields that were found)
+        and ``sections`` (canonical section name -> text)
+    """
+    sections = split_sections(text)
+    header = sections.get("header", "")
+    # Look in the header first so a referee's email or phone is not mistaken for the candidate's
+    body = "\n".join(v for k, v in sections.items() if k not in ("header", "references"))
+    fields = {
+        "Full Name": _name(header),
+        "Email Address": _first(EMAIL_RE, header, body),
+        "Phone Number": _phone(header, body),
+        "LinkedIn Profile URL": _first(LINKEDIN_RE, header, body),
+    }
+    return {"fields": {k: v for k, v in fields.items() if v}, "sections": sections}
+
+
+def llm_input(preparsed: Dict, text: str) -> str:
+    """The part of the resume the LLM still needs to read."""
+    sections = preparsed["sections"]
+    found = [name for name in LLM_SECTIONS if sections.get(name)]
+    if not found:
+        # No recognizable headings: the rules cannot tell what is safe to drop
+        return text
+    # Keep header lines such as a title or portfolio link, minus the contact details already found
+    known = [value for value in preparsed["fields"].values() if value]
+    header = [line for line in sections.get("header", "").splitlines()
+              if not any(value in line for value in known)]
+    parts = []
+    if preparsed["fields"].get("Full Name"):
+        parts.append(f"Full Name: {preparsed['fields']['Full Name']}")
+    if header:
+        parts.append("\n".join(header))
+    for name in found:
+        lines = [line for line in sections[name].splitlines() if not _RATING_RE.match(line)]
+        parts.append(f"{name.title()}\n" + "\n".join(lines))
+    return "\n\n".join(parts)
+
+
+def merge_fields(parsed: Dict, preparsed: Dict) -> Dict:
+    """Overlay the regex-extracted fields on the LLM result; they are exact where found."""
+    merged = dict(parsed)
+    for field, value in preparsed["fields"].items():
+        if field == "Full Name" and merged.get(field):
+            continue
+        merged[field] = value
+    return merged
+
+
+def partial_profile(preparsed: Dict) -> Dict:
+    """Best-effort resume profile from the rules alone, used when the LLM call fails."""
+    sections = preparsed["sections"]
+    skills = []
+    for line in sections.get("skills", "").splitlines():
+        for item in line.split(","):
+            item = item.strip(" •-–—\t")
+            if item and len(item) <= 40 and item not in skills:
+                skills.append(item)
+    education = [" ".join(sections["education"].split())] if sections.get("education") else []
+    return {
+        "Full Name": "",
+        "Email Address": "",
+        "Phone Number": "",
+        "LinkedIn Profile URL": "",
+        "Education": education,
+        "Work Experience": [],
+        "Technical Skills": skills,
+        "Soft Skills": [],
+        "Certifications": [],
+        "Projects": [],
+        **preparsed["fields"],
+    }
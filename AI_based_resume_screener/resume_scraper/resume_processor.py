@@ -1,20 +1,22 @@
 # resume_processor.py
+import asyncio
 import os
-from pypdf import PdfReader
 import json
 # Ensure resume_praser is in the same directory or accessible
-from resume_scraper.resume_praser import ats_extractor # Import the ats_extractor function
+from resume_scraper.resume_praser import ats_extractor, ats_extractor_async # Import the ats_extractor function
+from resume_scraper.metrics import timed
 
 # Assuming UPLOAD_PATH and save_file, extract_text_from_pdf are defined above this
 
 UPLOAD_PATH = "__DATA__" # Ensure this is consistent
-os.makedirs(UPLOAD_PATH, exist_ok=True)
 
 def save_file(file_object, filename="file.pdf"):
     """Save uploaded file to disk"""
     # Use a more unique filename to avoid conflicts if processing multiple resumes
     # For example: filename = f"resume_{os.path.basename(file_object.name)}_{int(time.time())}.pdf"
     # But for simplicity, let's stick to the current logic based on your code
+    # Created here rather than at import so importing the module has no side effects
+    os.makedirs(UPLOAD_PATH, exist_ok=True)
     file_path = os.path.join(UPLOAD_PATH, filename)
     # Add error handling for writing the file
     try:
@@ -31,6 +33,8 @@ def extract_text_from_pdf(file_path):
     if not file_path or not os.path.exists(file_path):
         print(f"Error: PDF file path is invalid or does not exist: {file_path}")
         return None
+    from pypdf import PdfReader
+
     try:
         reader = PdfReader(file_path)
         data = ""
@@ -48,6 +52,7 @@ def extract_text_from_pdf(file_path):
         return None
 
 # FIX THIS FUNCTION
+@timed("resume_parse")
 def parse_resume_from_file(file_object):
 
     # Save and read the file
@@ -75,3 +80,26 @@ def parse_resume_from_file(file_object):
         # If no error from extractor, return the successfully parsed dictionary
         return prased_data
 
+
+
+@timed("resume_parse")
+def parse_resume_from_path(file_path):
+    """
+    Parse a resume that is already on disk.
+
+    Unlike parse_resume_from_file this reads the PDF in place instead of copying
+    it to UPLOAD_PATH, so it is safe to call for many resumes in parallel.
+    """
+    resume_data = extract_text_from_pdf(file_path)
+    if not resume_data:
+        return {"error": f"Failed to extract text from {file_path}"}
+    return ats_extractor(resume_data)
+
+
+@timed("resume_parse")
+async def parse_resume_from_path_async(file_path):
+    """Async parse_resume_from_path: PDF text is extracted in a worker thread and Gemini is awaited."""
+    resume_data = await asyncio.to_thread(extract_text_from_pdf, file_path)
+    if not resume_data:
+        return {"error": f"Failed to extract text from {file_path}"}
+    return await ats_extractor_async(resume_data)
@@ -1,11 +1,14 @@
 # scraper.py
 import logging
+import os
 import time
 import random
-from typing import List
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from resume_scraper.metrics import span, timed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,8 +16,100 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# How to page through each job site.
+#   strategy: "scroll" keeps appending results to one list (infinite scroll),
+#             "next" replaces the list by clicking a next-page link
+#   item_selector: CSS selector matching one job card
+#   more_selector: button/link that loads more results (optional for "scroll")
+SITE_PROFILES = {
+    "www.linkedin.com": {
+        "strategy": "scroll",
+        "item_selector": "ul.jobs-search__results-list > li",
+        "more_selector": "button.infinite-scroller__show-more-button",
+    },
+}
+# Value of selenium's By.CSS_SELECTOR; selenium itself is only imported when a browser is started
+CSS_SELECTOR = "css selector"
+
+DEFAULT_PROFILE = {
+    "strategy": "next",
+    "item_selector": "li",
+    "more_selector": "a[rel='next']",
+}
+
+
+# Search page to crawl; {keyword} and {location} are URL-quoted. Point it at another
+# board (e.g. the load-test stub, see resume_scraper.stub_servers) with JOB_SEARCH_URL.
+DEFAULT_SEARCH_URL = "https://www.linkedin.com/jobs/search/?keywords={keyword}&location={location}"
+
+
+def _human_delay() -> Tuple[float, float]:
+    """Pause range between page loads, "min,max" seconds from SCRAPER_HUMAN_DELAY (default 2-4s)."""
+    low, _, high = os.getenv("SCRAPER_HUMAN_DELAY", "2,4").partition(",")
+    return float(low), float(high or low)
+
+
+class _HTTPElement:
+    def __init__(self, element):
+        self.element = element
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        return str(self.element) if name == "outerHTML" else self.element.get(name)
+
+    def is_displayed(self) -> bool:
+        return True
+
+
+class HTTPDriver:
+    """
+    The parts of ``webdriver.Chrome`` the crawler uses, over plain HTTP.
+
+    No JavaScript runs, so it only suits boards that render results server
+    side and page with links (clicking an element follows its href). Selected
+    with SCRAPER_BROWSER=http, e.g. for load tests against the stub job board.
+    """
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self.current_url = ""
+        self.page_source = ""
+        self._soup = None
+
+    def get(self, url: str):
+        request = urllib.request.Request(url, headers={"User-Agent": random_user_agent()})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            self.page_source = response.read().decode(response.headers.get_content_charset() or "utf-8", "replace")
+            self.current_url = response.geturl()
+        self._soup = None
+
+    def find_elements(self, by: str, selector: str) -> List[_HTTPElement]:
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+
+            self._soup = BeautifulSoup(self.page_source, "html.parser")
+        return [_HTTPElement(element) for element in self._soup.select(selector)]
+
+    def execute_script(self, script: str, *args):
+        if "click" in script and args:
+            href = args[0].get_attribute("href")
+            if href:
+                self.get(urljoin(self.current_url, href))
+            return None
+        if "scrollHeight" in script:
+            return len(self.page_source)
+        return None
+
+    def quit(self):
+        self._soup = None
+
+
+def create_webdriver():
+    if os.getenv("SCRAPER_BROWSER", "chrome").lower() == "http":
+        return HTTPDriver()
+
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
 
-def create_webdriver() -> webdriver.Chrome:
     options = Options()
     options.headless = True
     options.add_argument("--disable-blink-features=AutomationControlled")
@@ -25,6 +120,11 @@ def create_webdriver() -> webdriver.Chrome:
     return webdriver.Chrome(options=options)
 
 
+def build_search_url(keyword: str, location: str) -> str:
+    template = os.getenv("JOB_SEARCH_URL") or DEFAULT_SEARCH_URL
+    return template.format(keyword=quote(keyword), location=quote(location))
+
+
 def random_user_agent():
     agents = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36",
@@ -34,13 +134,14 @@ def random_user_agent():
     return random.choice(agents)
 
 
-def scrape_website(url: str, timeout: int = 30) -> str:
+@timed("scrape")
+def scrape_website(url: str, timeout: int = 30, human_delay: Tuple[float, float] = (2, 4)) -> str:
     try:
         driver = create_webdriver()
         logger.info(f"Opening {url}")
         driver.get(url)
 
-        time.sleep(random.uniform(2, 4))  # Mimic human delay
+        time.sleep(random.uniform(*human_delay))  # Mimic human delay
         html = driver.page_source
         driver.quit()
         logger.info("Scraping successful.")
@@ -50,7 +151,136 @@ def scrape_website(url: str, timeout: int = 30) -> str:
         return ""
 
 
+def site_profile(url: str) -> Dict:
+    return SITE_PROFILES.get(urlparse(url).netloc, DEFAULT_PROFILE)
+
+
+def wait_for_stable_dom(driver, item_selector: str, timeout: float = 10, poll: float = 0.5,
+                        stable_polls: int = 2) -> int:
+    """
+    Wait until the number of result items and the page height stop changing
+    for ``stable_polls`` consecutive polls (or ``timeout`` runs out).
+
+    Returns:
+        int: The number of items currently on the page
+    """
+    deadline = time.monotonic() + timeout
+    last, unchanged = None, 0
+    while True:
+        count = len(driver.find_elements(CSS_SELECTOR, item_selector))
+        state = (count, driver.execute_script("return document.body.scrollHeight"))
+        unchanged = unchanged + 1 if state == last else 0
+        if unchanged >= stable_polls or time.monotonic() >= deadline:
+            return count
+        last = state
+        time.sleep(poll)
+
+
+def _advance(driver, profile: Dict) -> bool:
+    """Load the next batch of results; False if the site offers no more."""
+    if profile["strategy"] == "scroll":
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
+    buttons = driver.find_elements(CSS_SELECTOR, profile["more_selector"]) if profile.get("more_selector") else []
+    visible = [button for button in buttons if button.is_displayed()]
+    if visible:
+        driver.execute_script("arguments[0].click()", visible[0])
+        return True
+    return profile["strategy"] == "scroll"
+
+
+def crawl_pages(url: str, target_jobs: int = 50, time_budget: float = 60, max_pages: int = 20,
+                profile: Optional[Dict] = None, human_delay: Optional[Tuple[float, float]] = None) -> Iterator[str]:
+    """
+    Page through a search and yield the HTML of each batch of new job cards
+    as soon as it has loaded, so cleaning and extraction can start before the
+    crawl is finished.
+
+    Stops once ``target_jobs`` cards were seen, ``time_budget`` seconds have
+    passed, ``max_pages`` batches were loaded or the site has no more results.
+    If the profile's item selector matches nothing, the whole page is yielded
+    once instead.
+    """
+    profile = profile or site_profile(url)
+    human_delay = human_delay or _human_delay()
+    deadline = time.monotonic() + time_budget
+    driver = None
+    try:
+        with span("scrape"):
+            driver = create_webdriver()
+            logger.info(f"Opening {url}")
+            driver.get(url)
+            time.sleep(random.uniform(*human_delay))  # Mimic human delay
+            count = wait_for_stable_dom(driver, profile["item_selector"])
+        if not count:
+            logger.info("No result items found, using the full page.")
+            yield driver.page_source
+            return
+
+        seen_total, seen_on_page = 0, 0
+        for page in range(1, max_pages + 1):
+            with span("scrape"):
+                items = driver.find_elements(CSS_SELECTOR, profile["item_selector"])
+                new_items = items[seen_on_page:]
+                html = "".join(item.get_attribute("outerHTML") or "" for item in new_items)
+            if not new_items:
+                break
+            seen_total += len(new_items)
+            seen_on_page = len(items)
+            logger.info(f"📄 Page {page}: {len(new_items)} new job cards ({seen_total} total)")
+            yield f"<html><body><ul>{html}</ul></body></html>"
+
+            if seen_total >= target_jobs or time.monotonic() >= deadline:
+                break
+            with span("scrape"):
+                if not _advance(driver, profile):
+                    break
+                time.sleep(random.uniform(*human_delay) / 2)
+                wait_for_stable_dom(driver, profile["item_selector"],
+                                    timeout=max(0.0, min(10.0, deadline - time.monotonic())))
+                if profile["strategy"] == "next":
+                    # The list was replaced, so every card on the new page is new
+                    seen_on_page = 0
+    except Exception as e:
+        logger.error(f"Scraping failed: {e}")
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+def check_not_modified(url: str, validators: Dict[str, str], timeout: int = 10) -> Tuple[bool, Dict[str, str]]:
+    """
+    Ask the server whether ``url`` changed since it returned ``validators``
+    (ETag / Last-Modified), using a conditional HEAD request.
+
+    Returns:
+        Tuple[bool, Dict[str, str]]: True if the server answered 304, and the
+        validators to store for next time (empty if the site sends none)
+    """
+    headers = {"User-Agent": random_user_agent()}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers, method="HEAD"), timeout=timeout) as response:
+            new_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            return False, {k: v for k, v in new_validators.items() if v}
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return True, validators
+        logger.debug(f"Conditional check for {url} failed: {e}")
+    except Exception as e:
+        logger.debug(f"Conditional check for {url} failed: {e}")
+    return False, {}
+
+
+@timed("clean")
 def clean_body_content(html: str) -> str:
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     body = soup.body
     if body:
@@ -58,6 +288,7 @@ def clean_body_content(html: str) -> str:
     return soup.get_text(separator="\n", strip=True)
 
 
+@timed("split")
 def split_dom_content(content: str, max_chars: int = 2000) -> List[str]:
     # Splits content into LLM-safe chunks
     paragraphs = content.split('\n')
@@ -0,0 +1,100 @@
+# startup.py
+"""
+Import-time budget check for the app modules.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and fails if the cumulative import time exceeds the budget, or if any of
+the heavy backends (selenium, bs4, langchain, google.generativeai, ...) was
+imported eagerly. Those should only load on first use (see lazy.py), so
+forked workers and serverless cold starts stay fast.
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.startup --budget-ms 600
+    python -m resume_scraper.startup --module aapp --top 10
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must not be imported just by loading the app
+LAZY_MODULES = (
+    "selenium", "bs4", "langchain", "langchain_core", "langchain_ollama", "ollama",
+    "google.generativeai", "pypdf", "numpy",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure_imports(module: str, runs: int = 3) -> Dict:
+    """
+    Returns:
+        Dict: ``total_us`` (best cumulative time over ``runs``) and ``modules``
+        (name -> cumulative microseconds) from that run
+    """
+    best: Optional[Dict] = None
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+        modules: Dict[str, int] = {}
+        total = 0
+        for line in proc.stderr.splitlines():
+            match = _LINE_RE.match(line)
+            if not match:
+                continue
+            cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+            modules[name] = cumulative
+            if name == module and len(indent) <= 1:
+                total = cumulative
+        if best is None or total < best["total_us"]:
+            best = {"total_us": total, "modules": modules}
+    return best
+
+
+def eager_heavy_imports(modules: Dict[str, int]) -> List[str]:
+    return sorted(lazy for lazy in LAZY_MODULES if lazy in modules)
+
+
+def check(module: str, budget_ms: float, runs: int = 3, top: int = 5) -> Dict:
+    measured = measure_imports(module, runs)
+    modules = measured["modules"]
+    eager = eager_heavy_imports(modules)
+    total_ms = measured["total_us"] / 1000
+    slowest = sorted(
+        ((name, us) for name, us in modules.items() if name not in (module, "site", "encodings")),
+        key=lambda item: item[1], reverse=True,
+    )[:top]
+    return {
+        "module": module,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "eager_heavy_imports": eager,
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+        "ok": total_ms <= budget_ms and not eager,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check app import time against a budget")
+    parser.add_argument("--module", action="append", help="Module to import (default: fapp and aapp)")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 600)))
+    parser.add_argument("--runs", type=int, default=3, help="Take the fastest of this many cold imports")
+    parser.add_argument("--top", type=int, default=5, help="Report this many slowest imports")
+    args = parser.parse_args()
+
+    results = [check(module, args.budget_ms, args.runs, args.top) for module in args.module or ["fapp", "aapp"]]
+    sys.stdout.write(json.dumps(results, indent=2) + "\n")
+    sys.exit(0 if all(result["ok"] for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# structured_output.py
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimal JSON-schema style descriptions of the objects we ask the LLMs for.
+# Only "type", "properties", "items" and "default" are used; anything the model
+# leaves out is filled from the defaults so callers always get the full shape.
+JOB_DETAILS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "job_title": {"type": "string"},
+        "company": {"type": "string"},
+        "location": {"type": "string"},
+        "description": {"type": "string"},
+        "requirements": {"type": "array", "items": {"type": "string"}},
+        "skills_required": {"type": "array", "items": {"type": "string"}},
+        "experience_level": {"type": "string"},
+        "salary_range": {"type": "string"},
+    },
+}
+
+MATCH_DETAILS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "match_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "matched_skills": {"type": "array", "items": {"type": "string"}},
+        "missing_skills": {"type": "array", "items": {"type": "string"}},
+        "match_reasoning": {"type": "string"},
+        "matched_experience": {"type": "array", "items": {"type": "string"}},
+        "improvement_suggestions": {"type": "array", "items": {"type": "string"}},
+        "additional_comments": {"type": "string"},
+    },
+}
+
+RESUME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "Full Name": {"type": "string"},
+        "Email Address": {"type": "string"},
+        "Phone Number": {"type": "string"},
+        "LinkedIn Profile URL": {"type": "string"},
+        "Education": {"type": "array", "items": {"type": "string"}},
+        "Work Experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "Company": {"type": "string"},
+                    "Position": {"type": "string"},
+                    "Duration": {"type": "string"},
+                    "Description": {"type": "string"},
+                },
+            },
+        },
+        "Technical Skills": {"type": "array", "items": {"type": "string"}},
+        "Soft Skills": {"type": "array", "items": {"type": "string"}},
+        "Certifications": {"type": "array", "items": {"type": "string"}},
+        "Projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "Name": {"type": "string"},
+                    "Description": {"type": "string"},
+                    "Technologies": {"type": "array", "items": {"type": "string"}},
+                    "URL": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+_WHITESPACE = " \t\r\n"
+_INCOMPLETE = object()
+
+
+class _TolerantParser:
+    """
+    Recursive-descent JSON parser that stops at the first problem instead of
+    raising. Whatever was parsed before that point is returned, with open
+    strings, arrays and objects closed, so a truncated LLM response still
+    yields every field it managed to emit.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.complete = True
+        # Top-level keys whose values were fully parsed
+        self.closed_keys: List[str] = []
+
+    def parse(self) -> Any:
+        self._skip_ws()
+        value = self._value(depth=0)
+        return None if value is _INCOMPLETE else value
+
+    def _skip_ws(self):
+        while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+            self.pos += 1
+
+    def _peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def _value(self, depth: int) -> Any:
+        ch = self._peek()
+        if ch == "{":
+            return self._object(depth)
+        if ch == "[":
+            return self._array(depth)
+        if ch == '"':
+            return self._string()
+        if ch == "-" or ch.isdigit():
+            return self._number()
+        for literal, value in (("true", True), ("false", False), ("null", None)):
+            if self.text.startswith(literal, self.pos):
+                self.pos += len(literal)
+                return value
+        self.complete = False
+        return _INCOMPLETE
+
+    def _object(self, depth: int) -> Dict:
+        result = {}
+        self.pos += 1
+        while True:
+            self._skip_ws()
+            ch = self._peek()
+            if ch == "}":
+                self.pos += 1
+                return result
+            if ch == ",":
+                self.pos += 1
+                continue
+            if ch != '"':
+                self.complete = False
+                return result
+            key = self._string()
+            if not self.complete:
+                return result
+            self._skip_ws()
+            if self._peek() != ":":
+                self.complete = False
+                return result
+            self.pos += 1
+            self._skip_ws()
+            value = self._value(depth + 1)
+            if value is _INCOMPLETE:
+                return result
+            result[key] = value
+            if not self.complete:
+                return result
+            if depth == 0:
+                self.closed_keys.append(key)
+
+    def _array(self, depth: int) -> List:
+        result = []
+        self.pos += 1
+        while True:
+            self._skip_ws()
+            ch = self._peek()
+            if ch == "]":
+                self.pos += 1
+                return result
+            if ch == ",":
+                self.pos += 1
+                continue
+            value = self._value(depth + 1)
+            if value is _INCOMPLETE:
+                return result
+            result.append(value)
+            if not self.complete:
+                return result
+
+    def _string(self) -> str:
+        chunks = []
+        self.pos += 1
+        text = self.text
+        while self.pos < len(text):
+            ch = text[self.pos]
+            if ch == '"':
+                self.pos += 1
+                return "".join(chunks)
+            if ch == "\\":
+                if self.pos + 1 >= len(text):
+                    break
+                esc = text[self.pos + 1]
+                if esc == "u":
+                    digits = text[self.pos + 2:self.pos + 6]
+                    if len(digits) < 4:
+                        break
+                    try:
+                        chunks.append(chr(int(digits, 16)))
+                    except ValueError:
+                        chunks.append(digits)
+                    self.pos += 6
+                    continue
+                chunks.append({"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}.get(esc, esc))
+                self.pos += 2
+                continue
+            chunks.append(ch)
+            self.pos += 1
+        # Ran off the end of the text: keep what we have of the string
+        self.complete = False
+        return "".join(chunks)
+
+    def _number(self) -> Any:
+        match = re.compile(r'-?\d+(\.\d+)?([eE][+-]?\d+)?').match(self.text, self.pos)
+        if not match:
+            self.complete = False
+            return _INCOMPLETE
+        self.pos = match.end()
+        if self.pos >= len(self.text):
+            # The number may have been cut mid-way ("8" of "85")
+            self.complete = False
+        literal = match.group(0)
+        return float(literal) if match.group(1) or match.group(2) else int(literal)
+
+
+def _strip_fences(text: str) -> str:
+    text = text.replace("```json", "").replace("```", "").strip()
+    return _CONTROL_CHARS.sub("", text)
+
+
+def parse_partial_json(text: str) -> Tuple[Any, bool]:
+    """
+    Parse a possibly truncated or trailing-garbage JSON object from LLM output.
+
+    Args:
+        text (str): Raw LLM response
+
+    Returns:
+        Tuple[Any, bool]: The salvaged value (None if nothing usable) and
+        whether the object was complete
+    """
+    text = _strip_fences(text or "")
+    try:
+        return json.loads(text), True
+    except json.JSONDecodeError:
+        pass
+    start = text.find("{")
+    if start == -1:
+        return None, False
+    parser = _TolerantParser(text[start:])
+    value = parser.parse()
+    return value, parser.complete
+
+
+class IncrementalJSONParser:
+    """
+    Feed an LLM response chunk by chunk and read the fields that are already
+    complete. Re-parsing is only done when a chunk can have finished a value.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.value: Dict = {}
+        self.closed_keys: List[str] = []
+        self.complete = False
+
+    def feed(self, chunk: str) -> Dict:
+        self.buffer += chunk
+        if any(ch in chunk for ch in ',}]"') or not self.value:
+            start = self.buffer.find("{")
+            if start != -1:
+                parser = _TolerantParser(_CONTROL_CHARS.sub("", self.buffer[start:]))
+                value = parser.parse()
+                if isinstance(value, dict):
+                    self.value = value
+                    self.closed_keys = parser.closed_keys
+                    self.complete = parser.complete
+        return self.value
+
+    def has_fields(self, fields: List[str]) -> bool:
+        """True once every field in ``fields`` has been fully emitted."""
+        return self.complete or all(field in self.closed_keys for field in fields)
+
+
+def _default_for(schema: Dict) -> Any:
+    if "default" in schema:
+        return schema["default"]
+    return {
+        "string": "",
+        "integer": 0,
+        "number": 0,
+        "boolean": False,
+        "array": [],
+        "object": {},
+    }.get(schema.get("type"), None)
+
+
+def conform_to_schema(data: Any, schema: Dict) -> Any:
+    """
+    Coerce ``data`` into the shape described by ``schema``: missing keys get
+    defaults, scalars are cast where that is unambiguous and unknown keys are
+    kept as-is.
+    """
+    expected = schema.get("type")
+    if expected == "object":
+        if not isinstance(data, dict):
+            data = {}
+        result = dict(data)
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in data:
+                result[key] = conform_to_schema(data[key], sub_schema)
+            else:
+                result[key] = _default_for(sub_schema)
+        return result
+    if expected == "array":
+        if data is None or data == "":
+            return []
+        if not isinstance(data, list):
+            data = [data]
+        item_schema = schema.get("items")
+        return [conform_to_schema(item, item_schema) for item in data] if item_schema else data
+    if expected == "string":
+        if data is None:
+            return ""
+        return data if isinstance(data, str) else json.dumps(data) if isinstance(data, (dict, list)) else str(data)
+    if expected in ("integer", "number"):
+        try:
+            value = float(str(data).strip().rstrip("%")) if not isinstance(data, (int, float)) else data
+        except ValueError:
+            value = _default_for(schema)
+        if "minimum" in schema:
+            value = max(schema["minimum"], value)
+        if "maximum" in schema:
+            value = min(schema["maximum"], value)
+        return int(round(value)) if expected == "integer" else value
+    return data
+
+
+def parse_json_response(response: str, schema: Optional[Dict] = None) -> Dict:
+    """
+    Parse an LLM JSON response, repairing truncated output where possible and
+    conforming it to ``schema`` when one is given.
+
+    Args:
+        response (str): Raw LLM response
+        schema (Optional[Dict]): Expected shape of the object
+
+    Returns:
+        Dict: Parsed object, or an empty dict if nothing could be salvaged
+    """
+    value, complete = parse_partial_json(response)
+    if not isinstance(value, dict) or not value:
+        logger.error("Could not parse JSON from LLM response")
+        logger.debug(f"Raw LLM Response: {response}")
+        return {}
+    if not complete:
+        logger.warning(f"Salvaged truncated JSON response with fields: {list(value)}")
+    return conform_to_schema(value, schema) if schema else value
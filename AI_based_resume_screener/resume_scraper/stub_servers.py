@@ -0,0 +1,322 @@
+# stub_servers.py
+"""
+Local HTTP stand-ins for every external service /upload depends on, for
+load tests that should not touch LinkedIn, Gemini or a real Ollama.
+
+    job board  serves the job cards in the checked-in scraped_content.html,
+               ``page_size`` per page with a rel="next" link between pages
+    ollama     POST /api/generate (streamed NDJSON or a single object)
+    gemini     POST /v1beta/models/<model>:generateContent (REST)
+
+Responses come from the same deterministic generators as fakes.py. Each
+server has its own latency and error rate; a failed request gets a 503.
+``StubServers.env()`` returns the environment variables that point the app
+at the stubs (JOB_SEARCH_URL, SCRAPER_BROWSER, OLLAMA_BASE_URL,
+GEMINI_API_ENDPOINT, ...).
+
+Usage (from AI_based_resume_screener/):
+    python -m resume_scraper.stub_servers --ollama-latency 0.5 --gemini-latency 1 --error-rate 0.01
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from resume_scraper.fakes import FakeGeminiModel, FakeOllamaLLM
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_HTML = os.path.join(ROOT_DIR, "scraped_content.html")
+BOARD_ITEM_SELECTOR = "ul.jobs-search__results-list > li"
+
+logger = logging.getLogger(__name__)
+
+
+class StubBehavior:
+    """
+    Latency and failure injection for one stub server.
+
+    Args:
+        latency (float): Seconds added before every response
+        jitter (float): Up to this many extra seconds, uniformly random
+        error_rate (float): Fraction of requests answered with 503
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def delay_and_decide(self) -> bool:
+        """Sleep for the configured latency; True if this request should fail."""
+        with self._lock:
+            self.requests += 1
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+            fail = bool(self.error_rate) and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        time.sleep(self.latency + extra)
+        return fail
+
+    def as_dict(self) -> Dict:
+        return {"requests": self.requests, "errors": self.errors}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = "cvision-stub/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json_body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _failed(self) -> bool:
+        if self.server.behavior.delay_and_decide():
+            self._send(503, b'{"error": "injected stub failure"}')
+            return True
+        return False
+
+
+def _board_pages(html: str, page_size: int) -> List[str]:
+    from bs4 import BeautifulSoup
+
+    items = [str(item) for item in BeautifulSoup(html, "html.parser").select(BOARD_ITEM_SELECTOR)]
+    if not page_size or not items:
+        return [html]
+    return ["".join(items[i:i + page_size]) for i in range(0, len(items), page_size)]
+
+
+class _BoardHandler(_StubHandler):
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self._failed():
+            return
+        pages = self.server.pages
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        page = max(0, min(int(query.get("page", 0) or 0), len(pages) - 1))
+        if len(pages) == 1 and not self.server.page_size:
+            body = pages[0]
+        else:
+            next_link = ""
+            if page + 1 < len(pages):
+                next_link = f'<a rel="next" href="{url.path}?{urlencode({**query, "page": page + 1})}">Next</a>'
+            body = f'<html><body><ul class="jobs">{pages[page]}</ul>{next_link}</body></html>'
+        self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+
+class _OllamaHandler(_StubHandler):
+    def do_GET(self):
+        if self.path.startswith("/api/version"):
+            self._send(200, b'{"version": "stub"}')
+        elif self.path.startswith("/api/tags"):
+            self._send(200, b'{"models": []}')
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def do_POST(self):
+        if not self.path.startswith("/api/generate"):
+            self._send(404, b'{"error": "not found"}')
+            return
+        request = self._json_body()
+        if self._failed():
+            return
+        model = request.get("model", "stub")
+        response = self.server.llm.respond(request.get("prompt", ""))
+        if not request.get("stream", True):
+            self._send(200, json.dumps({"model": model, "response": response, "done": True,
+                                        "done_reason": "stop"}).encode("utf-8"))
+            return
+        # Close-delimited NDJSON stream, one small chunk per line like a real generation
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        chunk_size, token_latency = self.server.llm.chunk_size, self.server.llm.token_latency
+        try:
+            for i in range(0, len(response), chunk_size):
+                if token_latency:
+                    time.sleep(token_latency)
+                line = {"model": model, "response": response[i:i + chunk_size], "done": False}
+                self.wfile.write(json.dumps(line).encode("utf-8") + b"\n")
+                self.wfile.flush()
+            self.wfile.write(json.dumps({"model": model, "response": "", "done": True,
+                                         "done_reason": "stop"}).encode("utf-8") + b"\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (e.g. two-phase scoring closed the stream early)
+            pass
+        self.close_connection = True
+
+
+class _GeminiHandler(_StubHandler):
+    def do_POST(self):
+        if ":generateContent" not in self.path:
+            self._send(404, b'{"error": {"code": 404, "message": "not found"}}')
+            return
+        request = self._json_body()
+        if self._failed():
+            return
+        prompt = "\n".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        body = {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": self.server.model.respond(prompt)}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4},
+        }
+        self._send(200, json.dumps(body).encode("utf-8"))
+
+
+_HANDLERS = {"board": _BoardHandler, "ollama": _OllamaHandler, "gemini": _GeminiHandler}
+
+
+def start_stub(kind: str, port: int = 0, host: str = "127.0.0.1", behavior: Optional[StubBehavior] = None,
+               page_size: int = 10, token_latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start one stub server in a daemon thread; ``port=0`` picks a free port."""
+    server = ThreadingHTTPServer((host, port), _HANDLERS[kind])
+    server.daemon_threads = True
+    server.behavior = behavior or StubBehavior()
+    if kind == "board":
+        with open(FIXTURE_HTML, encoding="utf-8") as f:
+            server.pages = _board_pages(f.read(), page_size)
+        server.page_size = page_size
+    elif kind == "ollama":
+        server.llm = FakeOllamaLLM(token_latency=token_latency)
+    else:
+        server.model = FakeGeminiModel()
+    threading.Thread(target=server.serve_forever, name=f"stub-{kind}", daemon=True).start()
+    return server
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+class StubServers:
+    """
+    The job board, Ollama and Gemini stubs together.
+
+    Args:
+        behaviors (Dict[str, StubBehavior]): Per-stub latency / errors, keyed
+            "board", "ollama" and "gemini"
+        ports (Dict[str, int]): Fixed ports; free ports are picked otherwise
+        page_size (int): Job cards per board page (0 serves the fixture whole)
+        token_latency (float): Seconds between streamed Ollama chunks
+    """
+
+    def __init__(self, behaviors: Optional[Dict[str, StubBehavior]] = None, ports: Optional[Dict[str, int]] = None,
+                 host: str = "127.0.0.1", page_size: int = 10, token_latency: float = 0.0):
+        self.behaviors = {kind: (behaviors or {}).get(kind) or StubBehavior() for kind in _HANDLERS}
+        self.ports = ports or {}
+        self.host = host
+        self.page_size = page_size
+        self.token_latency = token_latency
+        self.servers: Dict[str, ThreadingHTTPServer] = {}
+
+    def start(self) -> "StubServers":
+        for kind in _HANDLERS:
+            self.servers[kind] = start_stub(kind, self.ports.get(kind, 0), self.host, self.behaviors[kind],
+                                            page_size=self.page_size, token_latency=self.token_latency)
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+        self.servers = {}
+
+    def __enter__(self) -> "StubServers":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self) -> Dict[str, str]:
+        """Environment that points fapp / aapp at the stubs."""
+        return {
+            "JOB_SEARCH_URL": _url(self.servers["board"]) + "/jobs/search/?keywords={keyword}&location={location}",
+            "SCRAPER_BROWSER": "http",
+            "SCRAPER_HUMAN_DELAY": "0,0",
+            "OLLAMA_BASE_URL": _url(self.servers["ollama"]),
+            "GEMINI_API_ENDPOINT": _url(self.servers["gemini"]),
+            "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY") or "stub-key",
+        }
+
+    def stats(self) -> Dict[str, Dict]:
+        return {kind: behavior.as_dict() for kind, behavior in self.behaviors.items()}
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--board-latency", type=float, default=0.2)
+    parser.add_argument("--ollama-latency", type=float, default=0.5, help="Seconds before the first token")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 rate for every stub")
+    parser.add_argument("--board-error-rate", type=float)
+    parser.add_argument("--ollama-error-rate", type=float)
+    parser.add_argument("--gemini-error-rate", type=float)
+    parser.add_argument("--page-size", type=int, default=10, help="Job cards per board page")
+
+
+def stubs_from_args(args: argparse.Namespace, ports: Optional[Dict[str, int]] = None) -> StubServers:
+    def behavior(kind: str, seed: int) -> StubBehavior:
+        error_rate = getattr(args, f"{kind}_error_rate")
+        return StubBehavior(getattr(args, f"{kind}_latency"), args.jitter,
+                            args.error_rate if error_rate is None else error_rate, seed)
+
+    behaviors = {kind: behavior(kind, seed) for seed, kind in enumerate(("board", "ollama", "gemini"))}
+    return StubServers(behaviors, ports, page_size=args.page_size, token_latency=args.token_latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the job board, Ollama and Gemini stubs")
+    parser.add_argument("--board-port", type=int, default=8701)
+    parser.add_argument("--ollama-port", type=int, default=8702)
+    parser.add_argument("--gemini-port", type=int, default=8703)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    stubs = stubs_from_args(args, {"board": args.board_port, "ollama": args.ollama_port, "gemini": args.gemini_port})
+    with stubs:
+        for name, value in stubs.env().items():
+            print(f"export {name}='{value}'")
+        logger.info("Stubs running; Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()